@@ -3,25 +3,30 @@ import numpy as np
 
 from picamera2 import Picamera2
 from libcamera import controls
+import argparse
+import json
+import queue
+import threading
 import time
+import urllib.request
 import numpy
 
 def findPt(contour_main, perent_contour_second,output_image, color =(0, 255, 255) ):
-       
+
         x, y = contour_main[0][0]
-        x_parent, y_parent = parent_contour[0][0]
-    
-        xL, yL = contour[0][0]
+        x_parent, y_parent = perent_contour_second[0][0]
+
+        xL, yL = contour_main[0][0]
         x_parentL, y_parentL = perent_contour_second[0][0]
-        
+
         for pt in contour_main:
             if pt[0][0]>x:
-                x=pt[0][0] 
+                x=pt[0][0]
                 y= pt[0][1]
             if pt[0][0]<xL:
-                xL=pt[0][0] 
+                xL=pt[0][0]
                 yL= pt[0][1]
-            
+
         for pt in perent_contour_second:
             if pt[0][0]>x_parent:
                 x_parent =pt[0][0]
@@ -29,12 +34,161 @@ def findPt(contour_main, perent_contour_second,output_image, color =(0, 255, 255
             if pt[0][0]<x_parentL:
                 x_parentL =pt[0][0]
                 y_parentL = pt[0][1]
-                
+
         cv2.line(output_image, (x, y), (x_parent , y_parent), color, 1)
         cv2.putText(output_image, f"Left width: {x_parentL-xL}px", (xL, yL - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
         cv2.line(output_image, (xL, yL), (x_parentL , y_parentL), color, 1)
         cv2.putText(output_image, f"right width: {x_parent-x}px", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
-   
+
+
+# Конвеєр: захоплення -> обробка -> показ, кожен етап у своєму потоці.
+# Між етапами черги на один кадр: якщо наступний етап не встигає, старий
+# кадр викидається і лишається найновіший, тож затримка не росте, а FPS
+# обмежує найповільніший етап, а не сума всіх.
+
+STAGES = ["capture", "process", "display"]
+REPORT_INTERVAL = 1.0  # s між звітами на сервер
+min_area = 1000  # Мінімальна площа контуру для обробки
+
+
+class Stats:
+    """Час кожного етапу (ковзне середнє), FPS показу і викинуті кадри."""
+
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha
+        self.lock = threading.Lock()
+        self.ms = {stage: 0.0 for stage in STAGES}
+        self.latency_ms = 0.0
+        self.fps = 0.0
+        self.dropped = 0
+        self.last_shown = None
+
+    def stage(self, name, started):
+        ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.ms[name] += self.alpha * (ms - self.ms[name])
+
+    def drop(self):
+        with self.lock:
+            self.dropped += 1
+
+    def shown(self, captured):
+        now = time.perf_counter()
+        with self.lock:
+            if self.last_shown is not None:
+                self.fps += self.alpha * (1 / max(now - self.last_shown, 1e-6) - self.fps)
+            self.last_shown = now
+            self.latency_ms += self.alpha * ((now - captured) * 1000 - self.latency_ms)
+
+    def snapshot(self):
+        # формат /vision сервера: {"fps": ..., "<етап>_ms": ...}
+        with self.lock:
+            data = {"fps": self.fps, "latency_ms": self.latency_ms, "dropped": float(self.dropped)}
+            data.update({f"{stage}_ms": ms for stage, ms in self.ms.items()})
+        return data
+
+
+def put_latest(q, item, stats):
+    # Черга на один кадр: замість очікування викидаємо старий кадр
+    try:
+        q.put_nowait(item)
+    except queue.Full:
+        try:
+            q.get_nowait()
+            stats.drop()
+        except queue.Empty:
+            pass
+        q.put_nowait(item)
+
+
+def get_frame(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return None
+
+
+def capture_loop(picam2, frames, stats, stop):
+    while not stop.is_set():
+        started = time.perf_counter()
+        im = picam2.capture_array()
+        stats.stage("capture", started)
+        put_latest(frames, (started, im), stats)
+
+
+def process(im, low_black, high_black):
+        img_hsv = cv2.cvtColor(im, cv2.COLOR_BGR2HSV)
+        # Завантаження зображення
+        image = cv2.inRange(img_hsv, low_black, high_black)
+
+        # Застосування порогової обробки для виділення рамок
+        _, binary = cv2.threshold(image, 200, 255, cv2.THRESH_BINARY)
+
+        # Інверсія зображення, щоб рамки стали білими на чорному фоні
+        binary = cv2.bitwise_not(binary)
+
+        # Пошук контурів із використанням ієрархії
+        contours, hierarchy = cv2.findContours(binary, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+
+        # Створити копію зображення для відображення результатів
+        output_image = im
+
+        # Перебір контурів
+        for i, contour in enumerate(contours):
+            # Ігнорувати зовнішній контур, якщо він не має вкладених контурів
+            area = cv2.contourArea(contour)
+            if area < min_area:
+                continue  # Ігнорувати контур, якщо його площа менша за поріг
+
+            if hierarchy[0][i][2] != -1 and hierarchy[0][i][3] != -1 :  # Перевірка наявності дочірнього контуру
+                # Отримати батьківський контур (зовнішня рамка
+                x1, y1, w1, h1 = cv2.boundingRect(contour)
+
+                # Шукати дочірній контур (внутрішня рамка)
+                parent_idx = hierarchy[0][i][3]
+                parent_contour = contours[parent_idx]
+
+                child_idx = hierarchy[0][i][2]
+                child_contour = contours[child_idx]
+                # Виміряти ширину рамки як різницю між батьківським і дочірнім прямокутниками
+                findPt(contour, parent_contour, output_image, (255,255,0))
+                findPt(child_contour,contour, output_image, (255,0,255))
+
+                # Відобразити контури і виміри на зображенні
+                cv2.drawContours(output_image, [contour], -1, (0, 255, 0), 1)  # Зовнішній  gbr GREEN
+                cv2.drawContours(output_image, [child_contour], -1, (255, 255, 0), 1)  # Внутрішній контур BLUE
+                cv2.drawContours(output_image, [parent_contour], -1, (0, 0, 255), 1)  # Внутрішній контур RED
+
+        return image, output_image
+
+
+def process_loop(frames, results, thresholds, stats, stop):
+    while (item := get_frame(frames, stop)) is not None:
+        captured, im = item
+        started = time.perf_counter()
+        # пороги читає з трекбарів головний потік, тут лише беремо останні
+        low_black, high_black = thresholds["value"]
+        image, output_image = process(im, low_black, high_black)
+        stats.stage("process", started)
+        put_latest(results, (captured, image, output_image), stats)
+
+
+def report_loop(url, stats, stop):
+    # Звіт для /vision сервера; окремий потік, щоб мережа не гальмувала показ
+    while not stop.wait(REPORT_INTERVAL):
+        request = urllib.request.Request(url, data=json.dumps(stats.snapshot()).encode(),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            urllib.request.urlopen(request, timeout=REPORT_INTERVAL).close()
+        except OSError as e:
+            print(f"vision report failed: {e}")
+
+
+parser = argparse.ArgumentParser(description="Вимірювання рамок з камери")
+parser.add_argument("--server", help="URL /vision сервера, напр. http://localhost:8000/vision")
+args = parser.parse_args()
 
 cv2.startWindowThread()
 
@@ -73,24 +227,24 @@ trackbars = {}
 
 def on_trackbar(val):
         pass
-        
+
 def on_trackbar_exp(val):
         pass
-        
+
 def on_trackbar_lovH(val):
         pass
 def on_trackbar_lovS(val):
         pass
 def on_trackbar_lovV(val):
         pass
-        
+
 def on_trackbar_highH(val):
         pass
 def on_trackbar_highS(val):
         pass
 def on_trackbar_highV(val):
         pass
-        
+
 cv2.createTrackbar("focus", "Camera", 5,25, on_trackbar)
 cv2.createTrackbar("exposure", "Camera", 100,100000, on_trackbar_exp)
 
@@ -108,10 +262,33 @@ on_trackbar_prev = cv2.getTrackbarPos("focus", "Camera")
 on_trackbar_exp_prev = cv2.getTrackbarPos("exposure", "Camera")
 
 
-prev_time = time.time()
-
+def read_thresholds():
+        low_black = numpy.array([
+         cv2.getTrackbarPos("lov_h", "Camera1"),
+         cv2.getTrackbarPos("lov_s", "Camera1"),
+         cv2.getTrackbarPos("lov_v", "Camera1")], numpy.uint8)
+        high_black = numpy.array([
+        cv2.getTrackbarPos("high_h", "Camera1"),
+        cv2.getTrackbarPos("high_s", "Camera1"),
+        cv2.getTrackbarPos("high_v", "Camera1") ], numpy.uint8)
+        return low_black, high_black
+
+
+stats = Stats()
+stop = threading.Event()
+frames = queue.Queue(maxsize=1)
+results = queue.Queue(maxsize=1)
+thresholds = {"value": read_thresholds()}
+workers = [threading.Thread(target=capture_loop, args=(picam2, frames, stats, stop), daemon=True),
+           threading.Thread(target=process_loop, args=(frames, results, thresholds, stats, stop), daemon=True)]
+if args.server:
+    workers.append(threading.Thread(target=report_loop, args=(args.server, stats, stop), daemon=True))
+for worker in workers:
+    worker.start()
+
+# Головний потік: трекбари і показ (HighGUI працює лише тут)
 while True:
-        
+
          # Оновлення значень параметрів
         '''for control_name in trackbars.keys():
         trackbar_value = cv2.getTrackbarPos(control_name, "Camera")
@@ -120,93 +297,44 @@ while True:
             picam2.set_controls({control_name: trackbar_value})
             print(f"Updated {control_name} to {trackbar_value}")'''
 
-        
-        
+
+
         focus_track = cv2.getTrackbarPos("focus", "Camera")
         if focus_track != on_trackbar_prev:
                 on_trackbar_prev = focus_track
                 picam2.set_controls({"AfMode": controls.AfModeEnum.Manual, "LensPosition": focus_track})
                 print(focus_track)
-                
+
         exp_track = cv2.getTrackbarPos("exposure", "Camera")
         if exp_track != on_trackbar_exp_prev:
                 on_trackbar_exp_prev = exp_track
-                print(f"exp: {exp_track}" )        
+                print(f"exp: {exp_track}" )
                 picam2.set_controls({"ExposureTime": exp_track*10})
 
+        thresholds["value"] = read_thresholds()
 
-        
-        im = picam2.capture_array()
-        low_black = numpy.array([
-         cv2.getTrackbarPos("lov_h", "Camera1"),
-         cv2.getTrackbarPos("lov_s", "Camera1"),
-         cv2.getTrackbarPos("lov_v", "Camera1")], numpy.uint8)
-        high_black = numpy.array([
-        cv2.getTrackbarPos("high_h", "Camera1"), 
-        cv2.getTrackbarPos("high_s", "Camera1"),
-        cv2.getTrackbarPos("high_v", "Camera1") ], numpy.uint8)
-        
-        img_hsv = cv2.cvtColor(im, cv2.COLOR_BGR2HSV)
-        # Завантаження зображення
-        image = cv2.inRange(img_hsv, low_black, high_black)
-
-        # Застосування порогової обробки для виділення рамок
-        _, binary = cv2.threshold(image, 200, 255, cv2.THRESH_BINARY)
-
-        # Інверсія зображення, щоб рамки стали білими на чорному фоні
-        binary = cv2.bitwise_not(binary)
-
-        # Пошук контурів із використанням ієрархії
-        contours, hierarchy = cv2.findContours(binary, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-
-        # Створити копію зображення для відображення результатів
-        output_image = im
-
-        min_area = 1000  # Мінімальна площа контуру для обробки
-
-        # Перебір контурів
-        for i, contour in enumerate(contours):
-            # Ігнорувати зовнішній контур, якщо він не має вкладених контурів
-            area = cv2.contourArea(contour)
-            if area < min_area:
-                continue  # Ігнорувати контур, якщо його площа менша за поріг
-                
-            if hierarchy[0][i][2] != -1 and hierarchy[0][i][3] != -1 :  # Перевірка наявності дочірнього контуру
-                # Отримати батьківський контур (зовнішня рамка
-                print(hierarchy[0][i])
-                x1, y1, w1, h1 = cv2.boundingRect(contour)
-
-                # Шукати дочірній контур (внутрішня рамка)
-                parent_idx = hierarchy[0][i][3]
-                parent_contour = contours[parent_idx]
-                
-                child_idx = hierarchy[0][i][2]
-                child_contour = contours[child_idx]
-                # Виміряти ширину рамки як різницю між батьківським і дочірнім прямокутниками
-                findPt(contour, parent_contour, output_image, (255,255,0))
-                findPt(child_contour,contour, output_image, (255,0,255))
-                
-                
-                epsilon = 0.006*cv2.arcLength(parent_contour,True)
-                approx = cv2.approxPolyDP(parent_contour,epsilon,True)
-                
+        try:
+            captured, image, output_image = results.get(timeout=0.1)
+        except queue.Empty:
+            # немає нового кадру, але вікна мають реагувати на трекбари і 'q'
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+            continue
 
-                # Відобразити контури і виміри на зображенні
-                cv2.drawContours(output_image, [contour], -1, (0, 255, 0), 1)  # Зовнішній  gbr GREEN
-                cv2.drawContours(output_image, [child_contour], -1, (255, 255, 0), 1)  # Внутрішній контур BLUE
-                cv2.drawContours(output_image, [parent_contour], -1, (0, 0, 255), 1)  # Внутрішній контур RED
-               
-                        
-        current_time = time.time()
-        fps = 1/(current_time - prev_time)
-        prev_time = current_time
+        started = time.perf_counter()
+        fps = stats.fps
         cv2.putText(output_image, f"{fps:.2f}" ,(10,30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0), 2,cv2.LINE_AA)
         # Відображення зображення з результатами
         cv2.imshow("Camera1", image)
         cv2.imshow("Camera", output_image)
+        stats.stage("display", started)
+        stats.shown(captured)
 
         if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
-        
+
+stop.set()
+for worker in workers:
+    worker.join(timeout=1.0)
 picam2.close()
 cv2.destroyAllWindows()
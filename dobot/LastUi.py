@@ -1,12 +1,16 @@
 import tkinter as tk
 from tkinter import ttk
 import json
+from robot_worker import RobotWorker
 
 class RobotControlUI:
-    def __init__(self, root):
+    def __init__(self, root, worker=None):
         self.root = root
         self.root.title("Robot Control Panel")
 
+        # The worker thread owns the robot connection; the UI only talks to its queues
+        self.worker = worker if worker is not None else RobotWorker()
+
         # Virtual Keyboard for Axes
         self.create_virtual_keyboard()
 
@@ -19,6 +23,9 @@ class RobotControlUI:
         # Logs Window
         self.create_logs_window()
 
+        self.worker.attach(self.root, on_pose=self.show_live_pose, on_error=self.on_robot_error)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
     def create_virtual_keyboard(self):
         frame = tk.LabelFrame(self.root, text="Virtual Keyboard (Axes Control)", padx=10, pady=10)
         frame.pack(side="left", padx=10, pady=5, fill="y")
@@ -103,9 +110,23 @@ class RobotControlUI:
         self.joint_values[joint].set(self.joint_values[joint].get() - 1)
         self.log_message(f"Joint {joint} decremented to {self.joint_values[joint].get()}")
 
+    @staticmethod
+    def pose_to_position(pose):
+        x, y, z, r, j1, j2, j3, j4 = pose
+        return {"X": x, "Y": y, "Z": z, "R": r, "Joint1": j1, "Joint2": j2, "Joint3": j3}
+
+    def show_live_pose(self, pose):
+        position = self.pose_to_position(pose)
+        self.current_position_var.set("Current: " + "  ".join(f"{k}: {v:.2f}" for k, v in position.items()))
+
+    def on_robot_error(self, error):
+        self.log_message(f"Robot error: {error}")
+
     def load_current_position_to_fields(self):
-        # Simulated current position (replace with actual robot data retrieval)
-        current_position = {"X": 100.0, "Y": 200.0, "Z": 300.0, "Joint1": 45.0, "Joint2": 30.0, "Joint3": 60.0}
+        self.worker.pose(callback=self.fill_fields_from_pose)
+
+    def fill_fields_from_pose(self, pose):
+        current_position = self.pose_to_position(pose)
         for axis, value in current_position.items():
             if axis in self.axis_values:
                 self.axis_values[axis].set(value)
@@ -118,6 +139,10 @@ class RobotControlUI:
         modified_position = {axis: var.get() for axis, var in self.axis_values.items()}
         modified_position.update({joint: var.get() for joint, var in self.joint_values.items()})
         self.log_message(f"Sending modified position: {modified_position}")
+        # Joint fields are informational; the move is a Cartesian PTP keeping the current R
+        r = self.worker.last_pose[3] if self.worker.last_pose else 0
+        self.worker.move_to(modified_position["X"], modified_position["Y"], modified_position["Z"], r,
+                            callback=lambda pose: self.log_message(f"Move finished at {self.pose_to_position(pose)}"))
 
     def save_position(self):
         pos_name = f"Position {len(self.position_list['values']) + 1}"
@@ -169,13 +194,14 @@ class RobotControlUI:
             self.log_message(f"Error loading positions from file: {e}")
 
     def get_current_position(self):
-        # Simulated current position retrieval
-        current_position = {"X": 100.0, "Y": 200.0, "Z": 300.0, "Joint1": 45.0, "Joint2": 30.0, "Joint3": 60.0}
-        self.current_position_var.set(f"Current: {current_position}")
-        self.log_message(f"Current position: {current_position}")
+        self.worker.pose(callback=lambda pose: self.log_message(f"Current position: {self.pose_to_position(pose)}"))
 
     def reset_errors(self):
-        self.log_message("Errors reset.")
+        self.worker.clear_alarms(callback=lambda _: self.log_message("Errors reset."))
+
+    def close(self):
+        self.worker.close()
+        self.root.destroy()
 
     def log_message(self, message):
         self.log_text.insert(tk.END, message + "\n")
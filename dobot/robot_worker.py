@@ -0,0 +1,233 @@
+import math
+import queue
+import threading
+import time
+
+POSE_INTERVAL = 0.2      # s between pose reads while the robot is idle
+MOVE_POLL = 0.05         # s between pose reads during a move
+POLL_MS = 16             # Tk polling period for results (~60 fps)
+POSITION_TOLERANCE = 0.5 # mm, target counts as reached
+SETTLE_POLLS = 20        # identical reads in a row that mean the arm stopped
+MOVE_TIMEOUT = 60.0      # s, upper bound for a single move
+
+# SetJOGCmd codes in coordinate mode (isJoint = 0)
+JOG_STOP = 0
+JOG_X_PLUS, JOG_X_MINUS = 1, 2
+JOG_Y_PLUS, JOG_Y_MINUS = 3, 4
+JOG_Z_PLUS, JOG_Z_MINUS = 5, 6
+JOG_R_PLUS, JOG_R_MINUS = 7, 8
+
+
+def connect_first_port(verbose=False):
+    """Connect to the Dobot on the first serial port found."""
+    from serial.tools import list_ports
+    from pydobot import Dobot
+
+    port = list_ports.comports()[0].device
+    return Dobot(port=port, verbose=verbose)
+
+
+def raw_command(device, command_id, params=b"", rw=True, queued=False):
+    """Send a protocol command pydobot has no wrapper for (alarms, jog, ...)."""
+    from pydobot.message import Message
+
+    msg = Message()
+    msg.id = command_id
+    msg.ctrl = (0x01 if rw else 0x00) | (0x02 if queued else 0x00)
+    msg.params = bytearray(params)
+    return device._send_command(msg)
+
+
+class RobotWorker(threading.Thread):
+    """
+    Owns the Dobot connection in a background thread.
+
+    The Tk thread never touches the serial port: it puts commands into
+    ``commands`` and the worker posts pose updates and command results into
+    ``results``, which ``attach`` drains from the Tk loop with ``root.after``.
+    While idle the worker samples the pose every ``pose_interval`` seconds,
+    during a move or jog every ``MOVE_POLL`` seconds, so the UI can show it
+    live.
+
+    Jog input does not queue one move per click: ``retarget`` and ``jog``
+    overwrite a single pending motion slot, and the worker only ever acts on
+    the newest value. A move in flight is force-stopped and replaced as soon
+    as a newer target arrives.
+    """
+
+    def __init__(self, connect=connect_first_port, pose_interval=POSE_INTERVAL):
+        super().__init__(daemon=True)
+        self._connect = connect
+        self.pose_interval = pose_interval
+        self.commands = queue.Queue()
+        self.results = queue.Queue()
+        self.device = None
+        self.last_pose = None
+        self._motion_lock = threading.Lock()
+        self._motion = None
+        self._jogging = False
+        self._handlers = {
+            "motion": self._run_pending_motion,
+            "move_to": self._move_to,
+            "pose": self._read_pose,
+            "suction": self._suction,
+            "clear_alarms": self._clear_alarms,
+        }
+
+    # --- Called from the Tk thread ------------------------------------------
+
+    def submit(self, name, *args, callback=None):
+        """Queue a command; callback(result) is called in the Tk thread."""
+        self.commands.put((name, args, callback))
+
+    def move_to(self, x, y, z, r, callback=None):
+        self.submit("move_to", x, y, z, r, callback=callback)
+
+    def pose(self, callback=None):
+        self.submit("pose", callback=callback)
+
+    def suction(self, enable, callback=None):
+        self.submit("suction", enable, callback=callback)
+
+    def clear_alarms(self, callback=None):
+        self.submit("clear_alarms", callback=callback)
+
+    def close(self):
+        self.commands.put(("close", (), None))
+
+    def retarget(self, x, y, z, r):
+        """Set the newest jog target; older targets not yet reached are dropped."""
+        self._set_motion(("move", x, y, z, r))
+
+    def jog(self, command):
+        """Start continuous jogging with a JOG_* code, JOG_STOP to stop."""
+        self._set_motion(("jog", command))
+
+    def _set_motion(self, motion):
+        with self._motion_lock:
+            wake = self._motion is None
+            self._motion = motion
+        # One wake-up token per burst keeps the motion in order with later commands
+        if wake:
+            self.commands.put(("motion", (), None))
+
+    def attach(self, root, on_pose=None, on_error=None, interval_ms=POLL_MS):
+        """Start the worker and drain ``results`` from the Tk loop."""
+        def poll():
+            pose = None
+            while True:
+                try:
+                    kind, value, callback = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == "pose":
+                    pose = value
+                elif kind == "error":
+                    if on_error is not None:
+                        on_error(value)
+                elif callback is not None:
+                    callback(value)
+            # Only the newest pose of this frame is worth drawing
+            if pose is not None and on_pose is not None:
+                on_pose(pose)
+            root.after(interval_ms, poll)
+
+        if not self.is_alive():
+            self.start()
+        poll()
+
+    # --- Worker thread -----------------------------------------------------
+
+    def run(self):
+        try:
+            self.device = self._connect()
+        except Exception as e:
+            self.results.put(("error", e, None))
+            return
+
+        while True:
+            timeout = MOVE_POLL if self._jogging else self.pose_interval
+            try:
+                name, args, callback = self.commands.get(timeout=timeout)
+            except queue.Empty:
+                self._sample_pose()
+                continue
+            if name == "close":
+                break
+            try:
+                result = self._handlers[name](*args)
+            except Exception as e:
+                self.results.put(("error", e, None))
+                continue
+            self.results.put(("done", result, callback))
+
+        self.device.close()
+
+    def _sample_pose(self):
+        try:
+            self._read_pose()
+        except Exception as e:
+            self.results.put(("error", e, None))
+
+    def _read_pose(self):
+        self.last_pose = self.device.pose()
+        self.results.put(("pose", self.last_pose, None))
+        return self.last_pose
+
+    def _take_motion(self):
+        with self._motion_lock:
+            motion, self._motion = self._motion, None
+        return motion
+
+    def _run_pending_motion(self):
+        motion = self._take_motion()
+        while motion is not None:
+            if motion[0] == "jog":
+                self._jog(motion[1])
+                return self.last_pose
+            # _move_to hands back a motion that arrived while it was moving
+            motion = self._move_to(*motion[1:], preemptible=True)
+        return self.last_pose
+
+    def _move_to(self, x, y, z, r, preemptible=False):
+        """Send a PTP move and sample the pose until the arm gets there or stops."""
+        if self._jogging:
+            self._jog(JOG_STOP)
+        self.device.move_to(x, y, z, r, wait=False)
+        deadline = time.monotonic() + MOVE_TIMEOUT
+        previous = None
+        still = 0
+        while time.monotonic() < deadline:
+            pose = self._read_pose()
+            if preemptible:
+                motion = self._take_motion()
+                if motion is not None:
+                    # PTP targets cannot be edited in flight: stop, flush, replace
+                    self._abort_motion()
+                    return motion
+            if math.dist(pose[:4], (x, y, z, r)) <= POSITION_TOLERANCE:
+                break
+            # The target may be unreachable: an arm that stopped moving is done
+            still = still + 1 if pose == previous else 0
+            if still >= SETTLE_POLLS:
+                break
+            previous = pose
+            time.sleep(MOVE_POLL)
+        return None if preemptible else self.last_pose
+
+    def _abort_motion(self):
+        raw_command(self.device, 242)  # SetQueuedCmdForceStopExec
+        raw_command(self.device, 245)  # SetQueuedCmdClear
+        raw_command(self.device, 240)  # SetQueuedCmdStartExec
+
+    def _jog(self, command):
+        raw_command(self.device, 73, bytes([0, command]))
+        self._jogging = command != JOG_STOP
+        self._read_pose()
+
+    def _suction(self, enable):
+        self.device._set_end_effector_suction_cup(enable)
+        return enable
+
+    def _clear_alarms(self):
+        raw_command(self.device, 20)
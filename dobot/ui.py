@@ -1,20 +1,30 @@
 import tkinter as tk
-from serial.tools import list_ports
-from pydobot import Dobot
+import robot_worker
 
-# Підключення до Dobot
-port = list_ports.comports()[0].device
-device = Dobot(port=port, verbose=True)
+# Підключення до Dobot — з'єднанням володіє окремий робочий потік
+worker = robot_worker.RobotWorker()
 
-# Глобальні змінні для позиції
+# Глобальні змінні для цільової позиції
 x, y, z, r = 0, 0, 0, 0
 MAX_POSITION = 1999  # Максимальне значення для X, Y, Z
 
-def update_pose():
-    """Зчитує поточну позицію Dobot і оновлює мітку."""
+def show_pose(pose):
+    """Оновлює мітку поточною позицією, яку прочитав робочий потік."""
+    (px, py, pz, pr, j1, j2, j3, j4) = pose
+    label_pose.config(text=f"Позиція: x:{px:.2f} y:{py:.2f} z:{pz:.2f} r:{pr:.2f}")
+
+def update_pose(pose=None):
+    """Запитує позицію робота і синхронізує з нею цільову позицію."""
     global x, y, z, r
-    (x, y, z, r, j1, j2, j3, j4) = device.pose()
-    label_pose.config(text=f"Позиція: x:{x:.2f} y:{y:.2f} z:{z:.2f} r:{r:.2f}")
+    if pose is None:
+        worker.pose(callback=update_pose)
+        return
+    (x, y, z, r) = pose[:4]
+    show_pose(pose)
+
+def show_error(error):
+    """Показує помилку робочого потоку."""
+    label_pose.config(text=f"Помилка: {error}")
 
 def limit_position(val):
     """Обмежує значення позиції до меж."""
@@ -34,8 +44,7 @@ def move_to_custom():
         z = limit_position(float(coords[2]))
         r = limit_position(float(entry_r.get()))
         
-        device.move_to(x, y, z, r, wait=True)
-        update_pose()
+        worker.move_to(x, y, z, r)
     except ValueError:
         label_pose.config(text="Помилка: Некоректні дані!")
 
@@ -43,56 +52,61 @@ def move_x_plus():
     """Рух робота на 20 мм вперед по осі X."""
     global x
     x = limit_position(x + 20)
-    device.move_to(x, y, z, r, wait=True)
-    update_pose()
+    worker.retarget(x, y, z, r)
 
 def move_x_minus():
     """Рух робота на 20 мм назад по осі X."""
     global x
     x = limit_position(x - 20)
-    device.move_to(x, y, z, r, wait=True)
-    update_pose()
+    worker.retarget(x, y, z, r)
 
 def move_y_plus():
     """Рух робота на 20 мм вперед по осі Y."""
     global y
     y = limit_position(y + 20)
-    device.move_to(x, y, z, r, wait=True)
-    update_pose()
+    worker.retarget(x, y, z, r)
 
 def move_y_minus():
     """Рух робота на 20 мм назад по осі Y."""
     global y
     y = limit_position(y - 20)
-    device.move_to(x, y, z, r, wait=True)
-    update_pose()
+    worker.retarget(x, y, z, r)
 
 def move_z_plus():
     """Рух робота на 20 мм вгору по осі Z."""
     global z
     z = limit_position(z + 20)
-    device.move_to(x, y, z, r, wait=True)
-    update_pose()
+    worker.retarget(x, y, z, r)
 
 def move_z_minus():
     """Рух робота на 20 мм вниз по осі Z."""
     global z
     z = limit_position(z - 20)
-    device.move_to(x, y, z, r, wait=True)
+    worker.retarget(x, y, z, r)
+
+def start_jog(command):
+    """Починає безперервний рух, поки кнопку утримують."""
+    worker.jog(command)
+
+def stop_jog(event=None):
+    """Зупиняє безперервний рух і синхронізує ціль із фактичною позицією."""
+    worker.jog(robot_worker.JOG_STOP)
     update_pose()
 
 def toggle_suction():
     """Включає або вимикає вакуумний насос."""
-    if suction_var.get():
-        device._set_end_effector_suction_cup(True)
+    worker.suction(suction_var.get(), callback=show_suction)
+
+def show_suction(enabled):
+    """Оновлює мітку стану сопла після виконання команди."""
+    if enabled:
         label_suction.config(text="Сопло: Увімкнено")
     else:
-        device._set_end_effector_suction_cup(False)
         label_suction.config(text="Сопло: Вимкнено")
 
 def close_device():
     """Закриває з'єднання з роботом."""
-    device.close()
+    worker.close()
     root.destroy()
 
 # Графічний інтерфейс Tkinter
@@ -137,6 +151,22 @@ btn_z_plus.pack()
 btn_z_minus = tk.Button(root, text="Z -20", command=move_z_minus)
 btn_z_minus.pack()
 
+# Кнопки безперервного руху: робот рухається, поки кнопку утримують
+frame_jog = tk.LabelFrame(root, text="Утримуйте для руху")
+frame_jog.pack()
+
+jog_buttons = [
+    ("X+", robot_worker.JOG_X_PLUS), ("X-", robot_worker.JOG_X_MINUS),
+    ("Y+", robot_worker.JOG_Y_PLUS), ("Y-", robot_worker.JOG_Y_MINUS),
+    ("Z+", robot_worker.JOG_Z_PLUS), ("Z-", robot_worker.JOG_Z_MINUS),
+    ("R+", robot_worker.JOG_R_PLUS), ("R-", robot_worker.JOG_R_MINUS),
+]
+for i, (text, command) in enumerate(jog_buttons):
+    btn_jog = tk.Button(frame_jog, text=text, width=4)
+    btn_jog.grid(row=i % 2, column=i // 2)
+    btn_jog.bind("<ButtonPress-1>", lambda event, c=command: start_jog(c))
+    btn_jog.bind("<ButtonRelease-1>", stop_jog)
+
 # Вакуумний насос
 suction_var = tk.BooleanVar()
 check_suction = tk.Checkbutton(root, text="Включити сопло", variable=suction_var, command=toggle_suction)
@@ -149,7 +179,8 @@ label_suction.pack()
 btn_close = tk.Button(root, text="Вихід", command=close_device)
 btn_close.pack()
 
-# Ініціалізація позиції
+# Запуск робочого потоку, живе оновлення позиції та ініціалізація цілі
+worker.attach(root, on_pose=show_pose, on_error=show_error)
 update_pose()
 
 # Запуск інтерфейсу
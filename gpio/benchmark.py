@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# Per-frame cost of every animation on a mock strip, at several strip lengths.
+#
+# Animations run unpaced (wait_ms=0) against strips.MockStrip, so the time
+# between two show() calls is exactly what one frame costs to render and
+# push. Save a run with --json and compare later runs against it with
+# --baseline to catch regressions.
+#
+#   python benchmark.py --json base.json
+#   python benchmark.py --baseline base.json
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+import frames
+import gpio
+import strips
+
+SIZES = [30, 300, 3000]
+REGRESSION = 1.25         # slower than baseline by this factor counts as a regression
+
+
+def measure(animation, count, gamma):
+    gpio.FRAME_LUT = frames.make_lut(255, gamma) if gamma != 1.0 else None
+    strip = strips.MockStrip(count, record=False)
+    gpio.ANIMATIONS[animation](strip)
+    frame_times = np.diff(strip.times) * 1e6
+    return {
+        'frames': len(strip.times),
+        'mean_us': float(frame_times.mean()),
+        'p50_us': float(np.percentile(frame_times, 50)),
+        'p95_us': float(np.percentile(frame_times, 95)),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark LED animations on a mock strip.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='strip lengths')
+    parser.add_argument('--animations', nargs='+', choices=sorted(gpio.ANIMATIONS), default=list(gpio.ANIMATIONS))
+    parser.add_argument('-g', '--gamma', type=float, default=1.0, help='also apply a gamma LUT per frame')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='compare against results saved with --json')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    results = {}
+    regressions = 0
+    print(f"{'animation':<20} {'leds':>5} {'frames':>6} {'mean us':>9} {'p50 us':>9} {'p95 us':>9}")
+    for animation in args.animations:
+        for count in args.sizes:
+            key = f'{animation}/{count}'
+            result = results[key] = measure(animation, count, args.gamma)
+            line = (f"{animation:<20} {count:>5} {result['frames']:>6} {result['mean_us']:>9.1f} "
+                    f"{result['p50_us']:>9.1f} {result['p95_us']:>9.1f}")
+            if key in baseline:
+                ratio = result['p50_us'] / baseline[key]['p50_us']
+                line += f'  x{ratio:.2f}'
+                if ratio > REGRESSION:
+                    line += ' REGRESSION'
+                    regressions += 1
+            print(line)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# Precomputed animations.
+#
+# "render" runs any animation from gpio.py against a strip that writes each
+# shown frame to a file instead of the LEDs. "play" memory-maps such files
+# and streams their frames to the strip, so playback costs the same per
+# frame however expensive the effect was to compute.
+#
+#   python framefile.py render rainbowCycle rainbow.led --leds 300 --fps 50
+#   python framefile.py play rainbow.led chase.led --loop --crossfade 1.5
+#
+# File layout (little endian): a 32 byte header
+#   magic 'LEDF', version u8, format u8 (0 = packed uint32, 1 = RGB bytes),
+#   reserved u16, LED count u32, fps f32, frame count u32, 12 bytes padding
+# followed by the frames, one after the other.
+
+import argparse
+import bisect
+import mmap
+import struct
+
+import numpy as np
+
+import frames
+import gpio
+import scheduler
+import strips
+
+MAGIC = b'LEDF'
+VERSION = 1
+HEADER = struct.Struct('<4sBBHIfI12x')
+PACKED = 0
+RGB = 1
+FORMATS = {'packed': PACKED, 'rgb': RGB}
+
+
+class FrameWriter(strips.MockStrip):
+    """Strip backend that appends every shown frame to a frame file."""
+
+    def __init__(self, path, count, fps, fmt=PACKED):
+        super().__init__(count, record=False)
+        self.fps = fps
+        self.format = fmt
+        self.written = 0
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, fmt, 0, count, fps, 0))
+
+    def show(self):
+        frame = np.array(self._led_data, dtype=np.uint32)
+        if self.format == RGB:
+            self.file.write(frames.unpack_rgb(frame).tobytes())
+        else:
+            self.file.write(frame.astype('<u4').tobytes())
+        self.written += 1
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.format, 0, self.count, self.fps, self.written))
+        self.file.close()
+
+
+class FrameFile:
+    """A frame file mapped into memory; ``frame(j)`` is a packed frame."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.format, _, self.count, self.fps, self.frames = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path}: not a version {VERSION} frame file')
+        if self.format == RGB:
+            self.data = np.frombuffer(self.map, np.uint8, self.frames * self.count * 3, HEADER.size)
+            self.data = self.data.reshape(self.frames, self.count, 3)
+        else:
+            self.data = np.frombuffer(self.map, '<u4', self.frames * self.count, HEADER.size)
+            self.data = self.data.reshape(self.frames, self.count)
+        self.duration = self.frames / self.fps
+
+    def frame(self, j):
+        if self.format == RGB:
+            return frames.pack_rgb(self.data[j])
+        return self.data[j]
+
+    def at(self, t):
+        """Frame showing ``t`` seconds into the clip."""
+        return self.frame(min(self.frames - 1, int(t * self.fps)))
+
+    def close(self):
+        self.data = None
+        self.map.close()
+
+
+def record(animation, path, count, fps, fmt=PACKED):
+    writer = FrameWriter(path, count, fps, fmt)
+    try:
+        gpio.ANIMATIONS[animation](writer)
+    finally:
+        writer.close()
+    return writer.written
+
+
+class Playlist:
+    """
+    Clips played one after another on a time line, each one crossfading
+    into the next over ``crossfade`` seconds. ``render(j)`` gives the frame
+    for output frame j at ``fps``, so it can be paced by scheduler.play().
+    """
+
+    def __init__(self, clips, fps=None, crossfade=0.0, loop=False):
+        self.clips = clips
+        self.fps = fps or max(clip.fps for clip in clips)
+        self.loop = loop
+        self.crossfade = min([crossfade] + [clip.duration for clip in clips])
+        self.starts = []
+        start = 0.0
+        for clip in clips:
+            self.starts.append(start)
+            start += clip.duration - self.crossfade
+        # Looping, the last clip fades into the first; otherwise it plays out
+        self.period = start if loop else start + self.crossfade
+        self.frames = int(self.period * self.fps)
+
+    def fit(self, frame, count):
+        if len(frame) >= count:
+            return frame[:count]
+        return np.concatenate([frame, frames.blank(count - len(frame))])
+
+    def render(self, j, count):
+        t = j / self.fps
+        if self.loop:
+            first_pass = t < self.period
+            t %= self.period
+        k = bisect.bisect_right(self.starts, t) - 1
+        clip = self.clips[k]
+        frame = self.fit(clip.at(t - self.starts[k]), count)
+        # The previous clip is still fading out during the first seconds of this one
+        into = t - self.starts[k]
+        if self.crossfade > 0 and into < self.crossfade and (k > 0 or (self.loop and not first_pass)):
+            previous = self.clips[k - 1]
+            tail = self.fit(previous.at(previous.duration - self.crossfade + into), count)
+            frame = frames.blend(tail, frame, into / self.crossfade)
+        return frame
+
+    def play(self, strip, lut=None, stats=None):
+        count = strip.numPixels()
+        total = 2 ** 62 if self.loop else self.frames
+        return scheduler.play(strip, lambda j: self.render(j, count), total, 1.0 / self.fps, lut, stats)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render animations to frame files and play them back.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    render = commands.add_parser('render', help='record an animation to a frame file')
+    render.add_argument('animation', choices=sorted(gpio.ANIMATIONS))
+    render.add_argument('output')
+    render.add_argument('--leds', type=int, default=gpio.LED_COUNT)
+    render.add_argument('--fps', type=float, default=50.0, help='playback rate stored in the file')
+    render.add_argument('--format', choices=sorted(FORMATS), default='packed', help='rgb is 3 bytes per LED')
+    play = commands.add_parser('play', help='play frame files on the strip')
+    play.add_argument('files', nargs='+', help='playlist, played in order')
+    play.add_argument('--loop', action='store_true', help='repeat the playlist forever')
+    play.add_argument('--crossfade', type=float, default=0.0, help='seconds each clip fades into the next')
+    play.add_argument('--fps', type=float, help='output rate (default: fastest clip)')
+    play.add_argument('-b', '--backend', choices=sorted(strips.BACKENDS), default='ws281x', help='strip driver')
+    play.add_argument('-g', '--gamma', type=float, default=gpio.LED_GAMMA, help='gamma correction')
+    play.add_argument('-s', '--stats', action='store_true', help='print frame timing at the end')
+    args = parser.parse_args()
+
+    if args.command == 'render':
+        written = record(args.animation, args.output, args.leds, args.fps, FORMATS[args.format])
+        print(f'{args.output}: {written} frames of {args.leds} LEDs at {args.fps:g} fps')
+    else:
+        clips = [FrameFile(path) for path in args.files]
+        strip = strips.open_strip(args.backend, gpio.LED_COUNT, gpio.LED_PIN, gpio.LED_FREQ_HZ, gpio.LED_DMA,
+                                  gpio.LED_INVERT, gpio.LED_BRIGHTNESS, gpio.LED_CHANNEL)
+        lut = frames.make_lut(255, args.gamma) if args.gamma != 1.0 else None
+        stats = scheduler.FrameStats()
+        try:
+            Playlist(clips, args.fps, args.crossfade, args.loop).play(strip, lut, stats)
+        except KeyboardInterrupt:
+            frames.push_frame(strip, frames.blank(strip.numPixels()))
+        if args.stats:
+            print(stats)
+        for clip in clips:
+            clip.close()
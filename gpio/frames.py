@@ -0,0 +1,130 @@
+# Frame-based LED rendering.
+#
+# A frame is a NumPy uint32 array with one packed colour per pixel, in the
+# same 0xWWRRGGBB layout rpi_ws281x's Color() produces. Animations build a
+# whole frame with array operations and push it to the strip in one call.
+
+import numpy as np
+
+
+def color(red, green, blue, white=0):
+    """Pack a colour like rpi_ws281x.Color, without importing the driver."""
+    return (white << 24) | (red << 16) | (green << 8) | blue
+
+
+def _build_wheel():
+    pos = np.arange(256, dtype=np.int64)
+    red = np.select([pos < 85, pos < 170], [pos * 3, 255 - (pos - 85) * 3], 0)
+    green = np.select([pos < 85, pos < 170], [255 - pos * 3, 0], (pos - 170) * 3)
+    blue = np.select([pos < 85, pos < 170], [0, (pos - 85) * 3], 255 - (pos - 170) * 3)
+    return ((red << 16) | (green << 8) | blue).astype(np.uint32)
+
+# Rainbow colours across 0-255 positions, identical to the strandtest wheel()
+WHEEL = _build_wheel()
+
+
+def make_lut(brightness=255, gamma=1.0):
+    """256-entry channel lookup table applying brightness and gamma."""
+    levels = np.arange(256) / 255.0
+    return np.round((levels ** gamma) * brightness).astype(np.uint32)
+
+
+def apply_lut(frame, lut):
+    """Map every colour channel of ``frame`` through ``lut``."""
+    white = lut[(frame >> 24) & 0xFF]
+    red = lut[(frame >> 16) & 0xFF]
+    green = lut[(frame >> 8) & 0xFF]
+    blue = lut[frame & 0xFF]
+    return (white << 24) | (red << 16) | (green << 8) | blue
+
+
+def blank(count):
+    return np.zeros(count, dtype=np.uint32)
+
+
+def rainbow_frame(count, j):
+    """Frame ``j`` of rainbow(): every pixel one step further on the wheel."""
+    return WHEEL[(np.arange(count) + j) & 255]
+
+
+def rainbow_cycle_frame(count, j):
+    """Frame ``j`` of rainbowCycle(): the whole wheel spread over the strip."""
+    return WHEEL[((np.arange(count) * 256 // count) + j) & 255]
+
+
+def theater_rainbow_colors(count, j, q):
+    """
+    Colours theaterChaseRainbow() gives the pixels it lights on step ``j``
+    at offset ``q``: lit pixel p = i + q takes the colour of its group start i.
+    """
+    return WHEEL[(np.arange(count) - q + j) % 255]
+
+
+def wipe_frame(base, j, color, step=1):
+    """Frame ``j`` of colorWipe(): the first (j + 1) * step pixels painted over ``base``."""
+    frame = base.copy()
+    frame[:(j + 1) * step] = color
+    return frame
+
+
+def chase_frame(base, j, colors):
+    """
+    Frame ``j`` of a theater chase over ``base``: every third pixel lit,
+    starting at offset j % 3, and the offsets already visited turned off.
+    ``colors`` is one packed colour or a per-pixel frame.
+    """
+    q = j % 3
+    frame = base.copy()
+    for r in range(3):
+        if r != q and (j >= 3 or r < q):
+            frame[r::3] = 0
+    frame[q::3] = colors[q::3] if np.ndim(colors) else colors
+    return frame
+
+
+def blend(a, b, t):
+    """Mix frames ``a`` and ``b`` channel by channel, t = 0 gives a, t = 1 gives b."""
+    weight = int(round(t * 256))
+    out = np.zeros_like(a)
+    for shift in (0, 8, 16, 24):
+        ca = (a >> shift) & 0xFF
+        cb = (b >> shift) & 0xFF
+        out |= ((ca * (256 - weight) + cb * weight) >> 8) << shift
+    return out
+
+
+def pack_rgb(rgb):
+    """(..., 3) uint8 red/green/blue array to packed frames."""
+    rgb = rgb.astype(np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def unpack_rgb(frame):
+    """Packed frames to a (..., 3) uint8 red/green/blue array (white is dropped)."""
+    return np.stack([(frame >> 16) & 0xFF, (frame >> 8) & 0xFF, frame & 0xFF], axis=-1).astype(np.uint8)
+
+
+def read_frame(strip):
+    """Current strip contents as a frame."""
+    count = strip.numPixels()
+    return np.fromiter((strip.getPixelColor(i) for i in range(count)), dtype=np.uint32, count=count)
+
+
+def push_frame(strip, frame, lut=None):
+    """Write a whole frame to the strip and latch it with a single show()."""
+    write_frame(strip, frame, lut)
+    strip.show()
+
+
+def write_frame(strip, frame, lut=None):
+    """Write a whole frame into the strip buffer without showing it."""
+    if lut is not None:
+        frame = apply_lut(frame, lut)
+    values = frame.tolist()
+    led_data = getattr(strip, '_led_data', None)
+    if led_data is not None:
+        # rpi_ws281x accepts a slice assignment over the whole channel buffer
+        led_data[0:len(values)] = values
+    else:
+        for i, value in enumerate(values):
+            strip.setPixelColor(i, value)
@@ -5,9 +5,11 @@
 # Direct port of the Arduino NeoPixel library strandtest example.  Showcases
 # various animations on a strip of NeoPixels.
 
-import time
-from rpi_ws281x import *
 import argparse
+import frames
+import multistrip
+import scheduler
+import strips
 
 # LED strip configuration:
 LED_COUNT      = 30     # Number of LED pixels.
@@ -21,74 +23,90 @@ LED_CHANNEL    = 0       # set to '1' for GPIOs 13, 19, 41, 45 or 53
 
 
 
-# Define functions which animate LEDs in various ways.
-def colorWipe(strip, color, wait_ms=50):
-    """Wipe color across display a pixel at a time."""
-    for i in range(strip.numPixels()):
-        strip.setPixelColor(i, color)
-        strip.show()
-        time.sleep(wait_ms/1000.0)
+# Software brightness/gamma applied to every frame (1.0 = linear, no LUT).
+LED_GAMMA      = 1.0
+FRAME_LUT      = None
+SHOW_STATS     = False   # print achieved fps/jitter/overruns after each animation
+
+
+# Define functions which animate LEDs in various ways.  Each one renders
+# frame j as a NumPy array and is paced by scheduler.play() on absolute
+# deadlines, so a slow frame is skipped instead of stretching the animation.
+def colorWipe(strip, color, wait_ms=50, step=1):
+    """Wipe color across display, ``step`` pixels per frame."""
+    base = frames.read_frame(strip)
+    count = -(-len(base) // step)
+    return scheduler.play(strip, lambda j: frames.wipe_frame(base, j, color, step), count, wait_ms/1000.0, FRAME_LUT)
 
 def theaterChase(strip, color, wait_ms=50, iterations=10):
     """Movie theater light style chaser animation."""
-    for j in range(iterations):
-        for q in range(3):
-            for i in range(0, strip.numPixels(), 3):
-                strip.setPixelColor(i+q, color)
-            strip.show()
-            time.sleep(wait_ms/1000.0)
-            for i in range(0, strip.numPixels(), 3):
-                strip.setPixelColor(i+q, 0)
+    base = frames.read_frame(strip)
+    return scheduler.play(strip, lambda j: frames.chase_frame(base, j, color), iterations*3, wait_ms/1000.0, FRAME_LUT)
 
 def wheel(pos):
     """Generate rainbow colors across 0-255 positions."""
-    if pos < 85:
-        return Color(pos * 3, 255 - pos * 3, 0)
-    elif pos < 170:
-        pos -= 85
-        return Color(255 - pos * 3, 0, pos * 3)
-    else:
-        pos -= 170
-        return Color(0, pos * 3, 255 - pos * 3)
+    return int(frames.WHEEL[pos & 255])
 
 def rainbow(strip, wait_ms=20, iterations=1):
     """Draw rainbow that fades across all pixels at once."""
-    for j in range(256*iterations):
-        for i in range(strip.numPixels()):
-            strip.setPixelColor(i, wheel((i+j) & 255))
-        strip.show()
-        time.sleep(wait_ms/1000.0)
+    count = strip.numPixels()
+    return scheduler.play(strip, lambda j: frames.rainbow_frame(count, j), 256*iterations, wait_ms/1000.0, FRAME_LUT)
 
 def rainbowCycle(strip, wait_ms=20, iterations=5):
     """Draw rainbow that uniformly distributes itself across all pixels."""
-    for j in range(256*iterations):
-        for i in range(strip.numPixels()):
-            strip.setPixelColor(i, wheel((int(i * 256 / strip.numPixels()) + j) & 255))
-        strip.show()
-        time.sleep(wait_ms/1000.0)
+    count = strip.numPixels()
+    return scheduler.play(strip, lambda j: frames.rainbow_cycle_frame(count, j), 256*iterations, wait_ms/1000.0, FRAME_LUT)
 
 def theaterChaseRainbow(strip, wait_ms=50):
     """Rainbow movie theater light style chaser animation."""
-    for j in range(256):
-        for q in range(3):
-            for i in range(0, strip.numPixels(), 3):
-                strip.setPixelColor(i+q, wheel((i+j) % 255))
-            strip.show()
-            time.sleep(wait_ms/1000.0)
-            for i in range(0, strip.numPixels(), 3):
-                strip.setPixelColor(i+q, 0)
+    base = frames.read_frame(strip)
+    def render(j):
+        return frames.chase_frame(base, j, frames.theater_rainbow_colors(len(base), j // 3, j % 3))
+    return scheduler.play(strip, render, 256*3, wait_ms/1000.0, FRAME_LUT)
+
+def layeredDemo(strip, seconds=10):
+    """Rainbow cycle on one half of the strip at 50 fps, a chase on the other at 10 fps."""
+    half = strip.numPixels() // 2
+    rest = strip.numPixels() - half
+    chase = frames.blank(rest)
+    layers = [
+        scheduler.Layer('rainbow', lambda j: frames.rainbow_cycle_frame(half, j), 50, slice(0, half)),
+        scheduler.Layer('chase', lambda j: frames.chase_frame(chase, j, frames.color(127, 127, 127)), 10, slice(half, None)),
+    ]
+    return scheduler.Compositor(strip, layers, FRAME_LUT).run(seconds)
+
+# Each animation run unpaced, for recording to frame files and benchmarks
+ANIMATIONS = {
+    'colorWipe': lambda strip: colorWipe(strip, frames.color(255, 0, 0), 0),
+    'theaterChase': lambda strip: theaterChase(strip, frames.color(127, 127, 127), 0),
+    'rainbow': lambda strip: rainbow(strip, 0),
+    'rainbowCycle': lambda strip: rainbowCycle(strip, 0, 1),
+    'theaterChaseRainbow': lambda strip: theaterChaseRainbow(strip, 0),
+}
+
+def report(name, stats):
+    if SHOW_STATS:
+        print(f'  {name}: {stats}')
 
 # Main program logic follows:
 if __name__ == '__main__':
     # Process arguments
     parser = argparse.ArgumentParser()
     parser.add_argument('-c', '--clear', action='store_true', help='clear the display on exit')
+    parser.add_argument('-g', '--gamma', type=float, default=LED_GAMMA, help='gamma correction applied to every frame')
+    parser.add_argument('-b', '--backend', choices=sorted(strips.BACKENDS), default='ws281x', help='strip driver (mock runs without hardware)')
+    parser.add_argument('-l', '--layout', help='JSON layout spreading the strip over several outputs (see multistrip.py)')
+    parser.add_argument('-s', '--stats', action='store_true', help='print frame timing after each animation')
     args = parser.parse_args()
+    SHOW_STATS = args.stats
+    if args.gamma != 1.0:
+        FRAME_LUT = frames.make_lut(255, args.gamma)
 
-    # Create NeoPixel object with appropriate configuration.
-    strip = Adafruit_NeoPixel(LED_COUNT, LED_PIN, LED_FREQ_HZ, LED_DMA, LED_INVERT, LED_BRIGHTNESS, LED_CHANNEL)
-    # Intialize the library (must be called once before other functions).
-    strip.begin()
+    # Create NeoPixel object with appropriate configuration and intialize it.
+    if args.layout:
+        strip = multistrip.open_manager(args.layout, args.backend, LED_FREQ_HZ, LED_INVERT, LED_BRIGHTNESS)
+    else:
+        strip = strips.open_strip(args.backend, LED_COUNT, LED_PIN, LED_FREQ_HZ, LED_DMA, LED_INVERT, LED_BRIGHTNESS, LED_CHANNEL)
 
     print ('Press Ctrl-C to quit.')
     if not args.clear:
@@ -98,18 +116,20 @@ if __name__ == '__main__':
 
         while True:
             print ('Color wipe animations.')
-            colorWipe(strip, Color(255, 0, 0))  # Red wipe
-            colorWipe(strip, Color(0, 255, 0))  # Blue wipe
-            colorWipe(strip, Color(0, 0, 255))  # Green wipe
+            report('red wipe', colorWipe(strip, frames.color(255, 0, 0)))  # Red wipe
+            report('blue wipe', colorWipe(strip, frames.color(0, 255, 0)))  # Blue wipe
+            report('green wipe', colorWipe(strip, frames.color(0, 0, 255)))  # Green wipe
             print ('Theater chase animations.')
-            theaterChase(strip, Color(127, 127, 127))  # White theater chase
-            theaterChase(strip, Color(127,   0,   0))  # Red theater chase
-            theaterChase(strip, Color(  0,   0, 127))  # Blue theater chase
+            report('white chase', theaterChase(strip, frames.color(127, 127, 127)))  # White theater chase
+            report('red chase', theaterChase(strip, frames.color(127,   0,   0)))  # Red theater chase
+            report('blue chase', theaterChase(strip, frames.color(  0,   0, 127)))  # Blue theater chase
             print ('Rainbow animations.')
-            rainbow(strip)
-            rainbowCycle(strip)
-            theaterChaseRainbow(strip)
+            report('rainbow', rainbow(strip))
+            report('rainbowCycle', rainbowCycle(strip))
+            report('theaterChaseRainbow', theaterChaseRainbow(strip))
+            print ('Layered animations.')
+            report('layered', layeredDemo(strip))
 
     except KeyboardInterrupt:
         if args.clear:
-            colorWipe(strip, Color(0,0,0), 10)
+            colorWipe(strip, frames.color(0,0,0), 10)
@@ -0,0 +1,129 @@
+# Several physical strips driven as one logical strip.
+#
+# The Pi can feed WS281x data from one PWM output (GPIO 18 or GPIO 13) and
+# SPI (GPIO 10) at the same time. StripManager keeps one logical frame
+# buffer, maps segments of it onto the outputs and overlaps their transfers,
+# so a long installation split over two data lines refreshes about twice as
+# fast as one line carrying every LED.
+#
+# Both PWM channels share one FIFO and rpi_ws281x interleaves them in a
+# single DMA buffer, so two Adafruit_NeoPixel objects (one per channel)
+# reset each other's PWM setup and both lines show garbage. A layout may
+# therefore use at most one of pwm0/pwm1.
+#
+# A StripManager looks like a single strip (numPixels/setPixelColor/show),
+# so every animation, the scheduler and the status display run on it as is.
+
+import json
+import numpy as np
+
+import frames
+import strips
+
+# Physical outputs: data pin, PWM channel and DMA channel of each line.
+# Each output needs its own DMA channel. rpi_ws281x recommends 10 and warns
+# that 5 can corrupt the SD card filesystem on newer firmware, so the
+# outputs use 10, 11 and 12.
+OUTPUTS = {
+    'pwm0': {'pin': 18, 'channel': 0, 'dma': 10},
+    'pwm1': {'pin': 13, 'channel': 1, 'dma': 11},
+    'spi': {'pin': 10, 'channel': 0, 'dma': 12},
+}
+PWM_OUTPUTS = {'pwm0', 'pwm1'}
+
+
+class Segment:
+    """``length`` logical pixels from ``start`` shown on ``output`` from ``offset``."""
+
+    def __init__(self, start, length, output, offset=0, reverse=False):
+        self.start = start
+        self.length = length
+        self.output = output
+        self.offset = offset
+        self.reverse = reverse
+
+    def logical(self):
+        index = np.arange(self.start, self.start + self.length)
+        return index[::-1] if self.reverse else index
+
+
+class StripManager:
+    """One logical frame buffer fanned out to several physical strips."""
+
+    def __init__(self, outputs, segments):
+        self.outputs = outputs
+        self.segments = segments
+        self.count = max(segment.start + segment.length for segment in segments)
+        self._led_data = frames.blank(self.count)
+        # For each output, which logical pixel every physical pixel shows
+        self.maps = {}
+        for name, strip in outputs.items():
+            mapping = np.full(strip.numPixels(), self.count, dtype=np.intp)
+            for segment in segments:
+                if segment.output == name:
+                    mapping[segment.offset:segment.offset + segment.length] = segment.logical()
+            self.maps[name] = mapping
+        # PWM outputs first: their show() only starts a DMA transfer that runs
+        # on while the blocking SPI write goes out
+        self.order = sorted(outputs, key=lambda name: name not in PWM_OUTPUTS)
+
+    def begin(self):
+        pass
+
+    def numPixels(self):
+        return self.count
+
+    def getPixelColor(self, n):
+        return int(self._led_data[n])
+
+    def setPixelColor(self, n, color):
+        self._led_data[n] = color
+
+    def show(self):
+        # Physical pixels no segment covers read the extra, always black entry
+        padded = np.append(self._led_data, np.uint32(0))
+        # Threads would not help: the buffer copy and the driver's show() both
+        # hold the GIL. Fill every buffer first so the transfers start back to back.
+        for name in self.order:
+            frames.write_frame(self.outputs[name], padded[self.maps[name]])
+        for name in self.order:
+            self.outputs[name].show()
+
+
+def load_layout(path):
+    """
+    Read a layout file:
+      {"outputs": {"pwm0": 150, "spi": 150},
+       "segments": [{"start": 0, "length": 150, "output": "pwm0"},
+                    {"start": 150, "length": 150, "output": "spi", "reverse": true}]}
+    Without "segments" the outputs are chained in the order they are listed.
+    Only one PWM output can be used (see the note at the top).
+    """
+    with open(path) as file:
+        layout = json.load(file)
+    counts = layout['outputs']
+    unknown = set(counts) - set(OUTPUTS)
+    if unknown:
+        raise ValueError(f"unknown outputs {sorted(unknown)}, expected some of {sorted(OUTPUTS)}")
+    if PWM_OUTPUTS <= set(counts):
+        raise ValueError("pwm0 and pwm1 share one PWM FIFO; use one of them together with spi")
+    if 'segments' in layout:
+        segments = [Segment(**segment) for segment in layout['segments']]
+    else:
+        segments = []
+        start = 0
+        for name, count in counts.items():
+            segments.append(Segment(start, count, name))
+            start += count
+    return counts, segments
+
+
+def open_manager(layout, backend, freq_hz, invert, brightness):
+    """Open every output of a layout file and return the logical strip."""
+    counts, segments = load_layout(layout)
+    outputs = {}
+    for name, count in counts.items():
+        output = OUTPUTS[name]
+        outputs[name] = strips.open_strip(backend, count, output['pin'], freq_hz, output['dma'],
+                                          invert, brightness, output['channel'])
+    return StripManager(outputs, segments)
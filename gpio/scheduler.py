@@ -0,0 +1,157 @@
+# Frame pacing for LED animations.
+#
+# Frames are due at absolute deadlines start + k * period on the monotonic
+# clock, so the time spent rendering and in show() does not add up into
+# drift. Animations are functions of the frame index; when rendering falls
+# behind, the clock jumps to the frame that is due now instead of playing
+# the backlog, so an animation always shows the right frame for the time.
+
+import heapq
+import math
+import time
+
+import frames
+
+
+class FrameStats:
+    """Achieved frame rate, jitter and overruns of one paced stream."""
+
+    def __init__(self):
+        self.frames = 0
+        self.skipped = 0
+        self.overruns = 0
+        self.first = None
+        self.last = None
+        self._lateness_sum = 0.0
+        self._lateness_sq = 0.0
+
+    def record(self, deadline, started, finished, next_deadline):
+        self.frames += 1
+        if self.first is None:
+            self.first = started
+        self.last = started
+        lateness = started - deadline
+        self._lateness_sum += lateness
+        self._lateness_sq += lateness * lateness
+        if finished > next_deadline:
+            self.overruns += 1
+
+    @property
+    def fps(self):
+        if self.frames < 2:
+            return 0.0
+        return (self.frames - 1) / (self.last - self.first)
+
+    @property
+    def jitter(self):
+        """Standard deviation of frame start lateness, in seconds."""
+        if not self.frames:
+            return 0.0
+        mean = self._lateness_sum / self.frames
+        return math.sqrt(max(0.0, self._lateness_sq / self.frames - mean * mean))
+
+    def __str__(self):
+        return (f'{self.fps:.1f} fps, jitter {self.jitter * 1000:.2f} ms, '
+                f'{self.overruns} overruns, {self.skipped} skipped')
+
+
+class FrameClock:
+    """Yields frame indices on absolute deadlines, skipping frames when late."""
+
+    def __init__(self, period, stats=None):
+        self.period = period
+        self.stats = stats if stats is not None else FrameStats()
+        self.start = None
+        self.index = 0
+
+    def deadline(self, index):
+        return self.start + index * self.period
+
+    def wait(self):
+        """Sleep until the next frame is due and return its index."""
+        now = time.monotonic()
+        if self.start is None:
+            self.start = now
+        if self.period <= 0:
+            # Unpaced: as fast as frames can be rendered (benchmarks)
+            return self.index
+        due = self.deadline(self.index)
+        if now < due:
+            time.sleep(due - now)
+        elif now - due >= self.period:
+            # More than a whole frame behind: show the frame due now
+            behind = int((now - self.start) / self.period)
+            self.stats.skipped += behind - self.index
+            self.index = behind
+        return self.index
+
+    def done(self, started):
+        """Record the frame just shown and move on to the next one."""
+        finished = time.monotonic()
+        self.stats.record(self.deadline(self.index), started, finished, self.deadline(self.index + 1))
+        self.index += 1
+
+
+def play(strip, render, count, period, lut=None, stats=None):
+    """Show ``render(j)`` for j in range(count), one frame every ``period`` seconds."""
+    clock = FrameClock(period, stats)
+    while clock.wait() < count:
+        started = time.monotonic()
+        frames.push_frame(strip, render(clock.index), lut)
+        clock.done(started)
+    return clock.stats
+
+
+class Layer:
+    """An animation drawn into ``segment`` of the strip at its own rate."""
+
+    def __init__(self, name, render, fps, segment=slice(None)):
+        self.name = name
+        self.render = render
+        self.clock = FrameClock(1.0 / fps)
+        self.segment = segment
+
+
+class Compositor:
+    """
+    Runs several layers with independent frame rates on one strip.
+
+    Whenever any layer is due, every due layer renders into the shared
+    frame buffer and the strip is pushed once, so layers running at 10 and
+    60 fps cost one show() per 60 fps tick rather than one per layer.
+    """
+
+    def __init__(self, strip, layers, lut=None):
+        self.strip = strip
+        self.layers = layers
+        self.lut = lut
+        self.frame = frames.blank(strip.numPixels())
+        self.stats = FrameStats()
+
+    def run(self, duration=None):
+        start = time.monotonic()
+        for layer in self.layers:
+            layer.clock.start = start
+        heap = [(start, i) for i in range(len(self.layers))]
+        while duration is None or time.monotonic() - start < duration:
+            due, _ = heap[0]
+            now = time.monotonic()
+            if now < due:
+                time.sleep(due - now)
+            started = time.monotonic()
+            ready = []
+            while heap and heap[0][0] <= started:
+                ready.append(heapq.heappop(heap)[1])
+            for i in ready:
+                layer = self.layers[i]
+                j = layer.clock.wait()
+                self.frame[layer.segment] = layer.render(j)
+            frames.push_frame(self.strip, self.frame, self.lut)
+            finished = time.monotonic()
+            next_due = min([layer.clock.deadline(layer.clock.index + 1) for layer in self.layers])
+            self.stats.record(due, started, finished, next_due)
+            for i in ready:
+                layer = self.layers[i]
+                layer.clock.done(started)
+                heapq.heappush(heap, (layer.clock.deadline(layer.clock.index), i))
+        return self.stats
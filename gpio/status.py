@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# LED status display for the cell.
+#
+# Subscribes to the order server's /telemetry WebSocket and shows each arm's
+# state, the order backlog and the vision process on segments of the strip.
+# A segment is only rewritten when its pixels change, and show() is rate
+# limited, so an idle cell costs no DMA transfers and next to no CPU.
+#
+#   python status.py --url ws://127.0.0.1:8000/telemetry
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+import websockets
+
+import frames
+import gpio
+import strips
+
+MAX_HZ = 20               # show() calls per second at most
+RECONNECT_DELAY = 2.0     # s between attempts to reach the server
+BACKLOG_FULL = 50         # queued jobs/orders that light the whole backlog bar
+VISION_MIN_FPS = 5.0      # below this the vision process counts as faulty
+BACKLOG_LEDS = 10
+VISION_LEDS = 3
+
+IDLE = frames.color(0, 0, 40)
+BUSY = frames.color(0, 160, 0)
+ALARM = frames.color(255, 0, 0)
+BACKLOG = frames.color(160, 100, 0)
+VISION_OK = frames.color(0, 80, 40)
+VISION_FAULT = frames.color(255, 0, 80)
+LINK_LOST = frames.color(60, 30, 0)
+
+
+def arm_pixels(count, arm):
+    if arm is None:
+        return np.full(count, LINK_LOST, dtype=np.uint32)
+    if arm.get('alarm'):
+        return np.full(count, ALARM, dtype=np.uint32)
+    pixels = frames.blank(count)
+    pixels[:1] = BUSY if arm.get('job') is not None else IDLE
+    # Jobs waiting for this arm, one pixel each after the state pixel
+    pixels[1:1 + arm.get('queue', 0)] = BACKLOG
+    return pixels
+
+
+def backlog_pixels(count, state):
+    if state is None:
+        return np.full(count, LINK_LOST, dtype=np.uint32)
+    waiting = state.get('orders', {}).get('depth', 0)
+    waiting += sum(arm.get('queue', 0) for arm in state.get('arms', {}).values())
+    lit = min(count, -(-waiting * count // BACKLOG_FULL))
+    pixels = frames.blank(count)
+    pixels[:lit] = BACKLOG
+    return pixels
+
+
+def vision_pixels(count, state):
+    if state is None:
+        return np.full(count, LINK_LOST, dtype=np.uint32)
+    vision = state.get('vision')
+    if not vision:
+        return frames.blank(count)
+    if vision.get('error') or vision.get('fps', 0) < VISION_MIN_FPS:
+        return np.full(count, VISION_FAULT, dtype=np.uint32)
+    return np.full(count, VISION_OK, dtype=np.uint32)
+
+
+class StatusDisplay:
+    """
+    Keeps the strip in sync with the latest cell state.
+
+    ``update`` renders every segment into a new frame and compares it with
+    what is on the strip; only changed segments are written, and ``flush``
+    latches them with one show() no more than ``max_hz`` times a second.
+    """
+
+    def __init__(self, strip, max_hz=MAX_HZ, lut=None):
+        self.strip = strip
+        self.count = strip.numPixels()
+        self.period = 1.0 / max_hz
+        self.lut = lut
+        self.shown = frames.blank(self.count)
+        self.frame = frames.blank(self.count)
+        self.dirty = []
+        self.arms = []
+        self.segments = {}
+        self.last_show = 0.0
+        self.shows = 0
+
+    def layout(self, arms):
+        """Split the strip between arms, the backlog bar and the vision LEDs."""
+        fixed = BACKLOG_LEDS + VISION_LEDS
+        arm_leds = max(0, self.count - fixed) // max(1, len(arms))
+        segments = {}
+        start = 0
+        for name in arms:
+            segments[name] = slice(start, start + arm_leds)
+            start += arm_leds
+        segments['backlog'] = slice(self.count - fixed, self.count - VISION_LEDS)
+        segments['vision'] = slice(self.count - VISION_LEDS, self.count)
+        return segments
+
+    def update(self, state):
+        """Render ``state`` (a telemetry snapshot, or None when the link is down)."""
+        if state is not None:
+            self.arms = sorted(state.get('arms', {}))
+        segments = self.layout(self.arms)
+        frame = frames.blank(self.count)
+        for name in self.arms:
+            segment = segments[name]
+            arm = None if state is None else state['arms'].get(name)
+            frame[segment] = arm_pixels(segment.stop - segment.start, arm)
+        frame[segments['backlog']] = backlog_pixels(BACKLOG_LEDS, state)
+        frame[segments['vision']] = vision_pixels(VISION_LEDS, state)
+        self.frame = frame
+        if segments != self.segments:
+            # New layout: pixels may have moved between segments
+            self.segments = segments
+            self.dirty = [slice(0, self.count)] if not np.array_equal(frame, self.shown) else []
+        else:
+            self.dirty = [segment for segment in segments.values()
+                          if not np.array_equal(frame[segment], self.shown[segment])]
+
+    def due(self):
+        """Seconds until a pending change may be shown, or None if nothing is pending."""
+        if not self.dirty:
+            return None
+        return max(0.0, self.last_show + self.period - time.monotonic())
+
+    def flush(self):
+        if not self.dirty or self.due() > 0:
+            return False
+        values = frames.apply_lut(self.frame, self.lut) if self.lut is not None else self.frame
+        led_data = getattr(self.strip, '_led_data', None)
+        for segment in self.dirty:
+            if led_data is not None:
+                led_data[segment.start:segment.stop] = values[segment].tolist()
+            else:
+                for i in range(segment.start, segment.stop):
+                    self.strip.setPixelColor(i, int(values[i]))
+            self.shown[segment] = self.frame[segment]
+        self.strip.show()
+        self.dirty = []
+        self.last_show = time.monotonic()
+        self.shows += 1
+        return True
+
+
+async def follow(display, url):
+    """Apply telemetry frames as they arrive; show the link as lost while reconnecting."""
+    while True:
+        try:
+            async with websockets.connect(url) as socket:
+                print(f'connected to {url}')
+                while True:
+                    delay = display.due()
+                    try:
+                        message = await asyncio.wait_for(socket.recv(), delay)
+                    except asyncio.TimeoutError:
+                        display.flush()
+                        continue
+                    display.update(json.loads(message))
+                    display.flush()
+        except (OSError, websockets.WebSocketException) as e:
+            print(f'telemetry link lost: {e}')
+        display.update(None)
+        display.flush()
+        await asyncio.sleep(RECONNECT_DELAY)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Show cell status on the LED strip.')
+    parser.add_argument('--url', default='ws://127.0.0.1:8000/telemetry?hz=10', help='telemetry WebSocket')
+    parser.add_argument('--max-hz', type=float, default=MAX_HZ, help='show() calls per second at most')
+    parser.add_argument('-b', '--backend', choices=sorted(strips.BACKENDS), default='ws281x', help='strip driver')
+    parser.add_argument('-g', '--gamma', type=float, default=gpio.LED_GAMMA, help='gamma correction')
+    args = parser.parse_args()
+
+    strip = strips.open_strip(args.backend, gpio.LED_COUNT, gpio.LED_PIN, gpio.LED_FREQ_HZ, gpio.LED_DMA,
+                              gpio.LED_INVERT, gpio.LED_BRIGHTNESS, gpio.LED_CHANNEL)
+    lut = frames.make_lut(255, args.gamma) if args.gamma != 1.0 else None
+    display = StatusDisplay(strip, args.max_hz, lut)
+    try:
+        asyncio.run(follow(display, args.url))
+    except KeyboardInterrupt:
+        frames.push_frame(strip, frames.blank(strip.numPixels()))
@@ -0,0 +1,65 @@
+# Strip backends.
+#
+# Animations only need numPixels(), getPixelColor(), setPixelColor() and
+# show() (plus the optional _led_data buffer push_frame() writes into), so
+# the hardware driver is imported only when a real strip is opened. The
+# mock strip keeps everything in memory and records what was shown, which
+# lets the animations run and be benchmarked on any Linux box.
+
+import time
+
+import numpy as np
+
+
+class MockStrip:
+    """In-memory strip that records every shown frame and when it was shown."""
+
+    def __init__(self, count, brightness=255, record=True):
+        self.count = count
+        self.brightness = brightness
+        self.record = record
+        self._led_data = [0] * count
+        self.frames = []
+        self.times = []
+
+    def begin(self):
+        pass
+
+    def numPixels(self):
+        return self.count
+
+    def getPixelColor(self, n):
+        return self._led_data[n]
+
+    def setPixelColor(self, n, color):
+        self._led_data[n] = color
+
+    def setBrightness(self, brightness):
+        self.brightness = brightness
+
+    def getBrightness(self):
+        return self.brightness
+
+    def show(self):
+        self.times.append(time.perf_counter())
+        if self.record:
+            self.frames.append(np.array(self._led_data, dtype=np.uint32))
+
+
+def ws281x_strip(count, pin, freq_hz, dma, invert, brightness, channel):
+    from rpi_ws281x import Adafruit_NeoPixel
+    return Adafruit_NeoPixel(count, pin, freq_hz, dma, invert, brightness, channel)
+
+
+def mock_strip(count, pin, freq_hz, dma, invert, brightness, channel):
+    return MockStrip(count, brightness)
+
+
+BACKENDS = {'ws281x': ws281x_strip, 'mock': mock_strip}
+
+
+def open_strip(backend, count, pin, freq_hz, dma, invert, brightness, channel):
+    """Create a strip on ``backend`` and initialise it."""
+    strip = BACKENDS[backend](count, pin, freq_hz, dma, invert, brightness, channel)
+    strip.begin()
+    return strip
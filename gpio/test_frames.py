@@ -0,0 +1,97 @@
+# Frame-for-frame comparison of the NumPy animations with the original
+# strandtest loops, both run unpaced on a MockStrip.
+#
+#   python -m pytest gpio/test_frames.py
+
+import numpy as np
+import pytest
+
+import frames
+import gpio
+from strips import MockStrip
+
+COUNT = 30
+
+
+def Color(red, green, blue, white=0):
+    return (white << 24) | (red << 16) | (green << 8) | blue
+
+
+def wheel(pos):
+    if pos < 85:
+        return Color(pos * 3, 255 - pos * 3, 0)
+    elif pos < 170:
+        pos -= 85
+        return Color(255 - pos * 3, 0, pos * 3)
+    else:
+        pos -= 170
+        return Color(0, pos * 3, 255 - pos * 3)
+
+
+def old_colorWipe(strip, color):
+    for i in range(strip.numPixels()):
+        strip.setPixelColor(i, color)
+        strip.show()
+
+
+def old_theaterChase(strip, color, iterations=10):
+    for j in range(iterations):
+        for q in range(3):
+            for i in range(0, strip.numPixels(), 3):
+                strip.setPixelColor(i+q, color)
+            strip.show()
+            for i in range(0, strip.numPixels(), 3):
+                strip.setPixelColor(i+q, 0)
+
+
+def old_rainbow(strip, iterations=1):
+    for j in range(256*iterations):
+        for i in range(strip.numPixels()):
+            strip.setPixelColor(i, wheel((i+j) & 255))
+        strip.show()
+
+
+def old_rainbowCycle(strip, iterations=5):
+    for j in range(256*iterations):
+        for i in range(strip.numPixels()):
+            strip.setPixelColor(i, wheel((int(i * 256 / strip.numPixels()) + j) & 255))
+        strip.show()
+
+
+def old_theaterChaseRainbow(strip):
+    for j in range(256):
+        for q in range(3):
+            for i in range(0, strip.numPixels(), 3):
+                strip.setPixelColor(i+q, wheel((i+j) % 255))
+            strip.show()
+            for i in range(0, strip.numPixels(), 3):
+                strip.setPixelColor(i+q, 0)
+
+
+CASES = {
+    'colorWipe': (old_colorWipe, lambda strip: gpio.colorWipe(strip, Color(255, 0, 0), 0), (Color(255, 0, 0),)),
+    'theaterChase': (old_theaterChase, lambda strip: gpio.theaterChase(strip, Color(127, 127, 127), 0),
+                     (Color(127, 127, 127),)),
+    'rainbow': (old_rainbow, lambda strip: gpio.rainbow(strip, 0), ()),
+    'rainbowCycle': (old_rainbowCycle, lambda strip: gpio.rainbowCycle(strip, 0), ()),
+    'theaterChaseRainbow': (old_theaterChaseRainbow, lambda strip: gpio.theaterChaseRainbow(strip, 0), ()),
+}
+
+
+def test_wheel_table():
+    assert [int(c) for c in frames.WHEEL[:255]] == [wheel(pos) for pos in range(255)]
+
+
+@pytest.mark.parametrize('name', sorted(CASES))
+def test_same_frames_as_original_loop(name):
+    old, new, args = CASES[name]
+    expected, actual = MockStrip(COUNT), MockStrip(COUNT)
+    # start from a lit strip so pixels the chases never touch are checked too
+    for strip in (expected, actual):
+        for i in range(COUNT):
+            strip.setPixelColor(i, Color(1, 2, 3))
+    old(expected, *args)
+    new(actual)
+    assert len(actual.frames) == len(expected.frames)
+    for n, (a, b) in enumerate(zip(actual.frames, expected.frames)):
+        assert np.array_equal(a, b), f"frame {n} differs"
@@ -0,0 +1,121 @@
+import argparse
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+CACHE_SIZE = 4096         # products kept in memory
+CACHE_TTL = 300.0         # s before a cached entry is read again from disk
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    barcode TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    pick_x REAL NOT NULL, pick_y REAL NOT NULL, pick_z REAL NOT NULL, pick_r REAL NOT NULL,
+    place_x REAL NOT NULL, place_y REAL NOT NULL, place_z REAL NOT NULL, place_r REAL NOT NULL,
+    velocity REAL NOT NULL DEFAULT 50,
+    acceleration REAL NOT NULL DEFAULT 50
+);
+"""
+COLUMNS = "barcode, name, pick_x, pick_y, pick_z, pick_r, place_x, place_y, place_z, place_r, velocity, acceleration"
+
+
+@dataclass(frozen=True)
+class Product:
+    barcode: str
+    name: str
+    pick: tuple[float, float, float, float]
+    place: tuple[float, float, float, float]
+    velocity: float = 50.0       # PTP velocity ratio, %
+    acceleration: float = 50.0   # PTP acceleration ratio, %
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "Product":
+        return cls(row[0], row[1], tuple(row[2:6]), tuple(row[6:10]), row[10], row[11])
+
+    def to_row(self) -> tuple:
+        return (self.barcode, self.name, *self.pick, *self.place, self.velocity, self.acceleration)
+
+
+class ProductCatalog:
+    """
+    Barcode -> product lookup backed by SQLite, behind an LRU cache with TTL.
+
+    ``preload`` fills the cache in one query at startup, so hot barcodes
+    resolve from a dict. Unknown barcodes are cached too (as None), so a
+    scanner repeating a bad code does not hit the disk every time.
+    """
+
+    def __init__(self, path: str, capacity: int = CACHE_SIZE, ttl: float = CACHE_TTL) -> None:
+        self.path = path
+        self.capacity = capacity
+        self.ttl = ttl
+        self.db: sqlite3.Connection | None = None
+        self.cache: OrderedDict[str, tuple[float, Product | None]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def open(self) -> None:
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def preload(self) -> int:
+        expires = time.monotonic() + self.ttl
+        rows = self.db.execute(f"SELECT {COLUMNS} FROM products LIMIT ?", (self.capacity,))
+        for row in rows:
+            self.cache[row[0]] = (expires, Product.from_row(row))
+        return len(self.cache)
+
+    def get(self, barcode: str) -> Product | None:
+        entry = self.cache.get(barcode)
+        now = time.monotonic()
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            self.cache.move_to_end(barcode)
+            return entry[1]
+        self.misses += 1
+        row = self.db.execute(f"SELECT {COLUMNS} FROM products WHERE barcode = ?", (barcode,)).fetchone()
+        product = Product.from_row(row) if row else None
+        self._store(barcode, product, now)
+        return product
+
+    def put(self, product: Product) -> None:
+        with self.db:
+            self.db.execute(f"INSERT OR REPLACE INTO products ({COLUMNS}) VALUES ({', '.join('?' * 12)})", product.to_row())
+        self._store(product.barcode, product, time.monotonic())
+
+    def _store(self, barcode: str, product: Product | None, now: float) -> None:
+        self.cache[barcode] = (now + self.ttl, product)
+        self.cache.move_to_end(barcode)
+        if len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+
+
+def import_json(catalog: ProductCatalog, path: str) -> int:
+    """Load products from a JSON list of {barcode, name, pick, place, velocity, acceleration}."""
+    with open(path) as file:
+        entries = json.load(file)
+    for entry in entries:
+        catalog.put(Product(
+            entry["barcode"], entry.get("name", entry["barcode"]),
+            tuple(entry["pick"]), tuple(entry["place"]),
+            entry.get("velocity", 50.0), entry.get("acceleration", 50.0)))
+    return len(entries)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Import products into the barcode catalog.")
+    parser.add_argument('json', help='JSON file with a list of products')
+    parser.add_argument('--db', default='catalog.db', help='catalog database')
+    args = parser.parse_args()
+
+    catalog = ProductCatalog(args.db)
+    catalog.open()
+    print(f"imported {import_json(catalog, args.json)} products")
+    catalog.close()
@@ -0,0 +1,143 @@
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from orders import Order
+
+MAX_GROUP = 2000          # orders written in one transaction at most
+RETRY_DELAY = 1.0         # s before retrying after a failed commit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    barcode TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    priority INTEGER NOT NULL,
+    deadline REAL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    created REAL
+);
+CREATE INDEX IF NOT EXISTS orders_status ON orders (status);
+"""
+
+
+class OrderJournal:
+    """
+    Append-only SQLite (WAL) log of accepted orders.
+
+    ``append`` returns once the order is on disk, but callers never pay for
+    their own fsync: while one transaction commits on the journal thread,
+    new orders pile up and go into the next one together. Orders are marked
+    ``done`` when their job finishes, and ``pending`` returns everything
+    that was accepted but never finished, for replay after a restart.
+    ``created`` is the wall-clock time an order was accepted, so the log
+    can also be replayed through the line simulation.
+    """
+
+    def __init__(self, path: str, max_group: int = MAX_GROUP) -> None:
+        self.path = path
+        self.max_group = max_group
+        self.next_id = 1
+        self.db: sqlite3.Connection | None = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+        self._appends: list[tuple[Order, float, asyncio.Future]] = []
+        self._updates: list[tuple[str, int]] = []
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def append(self, order: Order) -> Order:
+        order.ids = [self.next_id]
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._appends.append((order, time.time(), future))
+        self._wake.set()
+        await future
+        return order
+
+    async def append_many(self, orders: list[Order]) -> list[Order]:
+        """Like ``append`` for many orders at once, without a task per order."""
+        loop = asyncio.get_running_loop()
+        created = time.time()
+        futures = []
+        for order in orders:
+            order.ids = [self.next_id]
+            self.next_id += 1
+            future = loop.create_future()
+            self._appends.append((order, created, future))
+            futures.append(future)
+        self._wake.set()
+        await asyncio.gather(*futures)
+        return orders
+
+    def complete(self, ids: list[int], status: str = "done") -> None:
+        self._updates.extend((status, i) for i in ids)
+        self._wake.set()
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._open)
+        self._task = asyncio.create_task(self._writer())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Flush what was accepted after the last group
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._commit, [entry[:2] for entry in self._appends], self._updates)
+        await loop.run_in_executor(self.executor, self.db.close)
+        self.executor.shutdown()
+
+    async def pending(self) -> list[Order]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._pending)
+
+    def _open(self) -> None:
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # FULL makes every commit durable; group commit keeps their number low
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript(SCHEMA)
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(orders)")]
+        if "created" not in columns:
+            # Journals written before orders were timestamped
+            self.db.execute("ALTER TABLE orders ADD COLUMN created REAL")
+        (last,) = self.db.execute("SELECT COALESCE(MAX(id), 0) FROM orders").fetchone()
+        self.next_id = last + 1
+
+    def _pending(self) -> list[Order]:
+        rows = self.db.execute(
+            "SELECT id, barcode, count, priority, deadline FROM orders WHERE status = 'queued' ORDER BY id")
+        return [Order(barcode, count, priority, deadline, ids=[i]) for i, barcode, count, priority, deadline in rows]
+
+    def _commit(self, orders: list[tuple[Order, float]], updates: list[tuple[str, int]]) -> None:
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO orders (id, barcode, count, priority, deadline, created) VALUES (?, ?, ?, ?, ?, ?)",
+                [(o.ids[0], o.barcode, o.count, o.priority, o.deadline, created) for o, created in orders])
+            self.db.executemany("UPDATE orders SET status = ? WHERE id = ?", updates)
+
+    async def _writer(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while self._appends or self._updates:
+                group, self._appends = self._appends[:self.max_group], self._appends[self.max_group:]
+                updates, self._updates = self._updates, []
+                try:
+                    await loop.run_in_executor(self.executor, self._commit, [entry[:2] for entry in group], updates)
+                except Exception as e:
+                    print(f"journal commit of {len(group)} orders and {len(updates)} updates failed: {e}")
+                    for *_, future in group:
+                        if not future.done():
+                            future.set_exception(e)
+                    # Keep the status marks, or finished orders would be replayed after a restart
+                    self._updates[:0] = updates
+                    await asyncio.sleep(RETRY_DELAY)
+                    continue
+                for *_, future in group:
+                    if not future.done():
+                        future.set_result(None)
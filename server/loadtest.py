@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# Load test for the order server.
+#
+# By default the Litestar app is driven in-process through ASGI, with the
+# robots replaced by simulated arms and the journal/catalog in a temporary
+# directory. With --url it talks HTTP/1.1 keep-alive to a running server.
+#
+#   python loadtest.py --scenario order --concurrency 50 --duration 10
+#   python loadtest.py --url http://127.0.0.1:8000 --scenario mixed --json base.json
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+BULK_ITEMS = 100          # items per request in the bulk scenario
+BARCODES = 200            # distinct barcodes the scenarios draw from
+
+
+def request_test():
+    return "GET", "/test", {"book_id": random.randint(1, 1000)}, b"", ()
+
+def request_order():
+    query = {"barcode": f"sku{random.randrange(BARCODES)}", "count": random.randint(1, 5)}
+    return "POST", "/order-count", query, b"", ()
+
+def request_bulk():
+    lines = [json.dumps({"barcode": f"sku{random.randrange(BARCODES)}", "count": 1}) for _ in range(BULK_ITEMS)]
+    return "POST", "/orders/bulk", {}, "\n".join(lines).encode(), ((b"content-type", b"application/x-ndjson"),)
+
+def request_mixed():
+    return random.choices([request_test, request_order, request_bulk], [1, 8, 1])[0]()
+
+SCENARIOS = {"test": request_test, "order": request_order, "bulk": request_bulk, "mixed": request_mixed}
+
+
+class ASGIClient:
+    """Calls an ASGI app directly, including its lifespan startup/shutdown."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self._lifespan_in: asyncio.Queue = asyncio.Queue()
+        self._lifespan_out: asyncio.Queue = asyncio.Queue()
+        self._lifespan: asyncio.Task | None = None
+
+    async def startup(self) -> None:
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        self._lifespan = asyncio.create_task(self.app(scope, self._lifespan_in.get, self._lifespan_out.put))
+        await self._lifespan_in.put({"type": "lifespan.startup"})
+        message = await self._lifespan_out.get()
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"startup failed: {message}")
+
+    async def close(self) -> None:
+        """Workers share one client; the app lives until ``shutdown``."""
+
+    async def shutdown(self) -> None:
+        await self._lifespan_in.put({"type": "lifespan.shutdown"})
+        await self._lifespan_out.get()
+        await self._lifespan
+
+    async def request(self, method, path, query, body, headers) -> int:
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+            "query_string": urlencode(query).encode(), "root_path": "",
+            "headers": [(b"host", b"loadtest"), (b"content-length", str(len(body)).encode()), *headers],
+            "client": ("127.0.0.1", 0), "server": ("loadtest", 80), "state": {},
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        status = 0
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await asyncio.Event().wait()
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await self.app(scope, receive, send)
+        return status
+
+
+class HTTPClient:
+    """Minimal HTTP/1.1 keep-alive client, one connection per worker."""
+
+    def __init__(self, url: str) -> None:
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.reader = None
+        self.writer = None
+
+    async def start(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    async def request(self, method, path, query, body, headers) -> int:
+        target = f"{path}?{urlencode(query)}" if query else path
+        head = [f"{method} {target} HTTP/1.1", f"Host: {self.host}", f"Content-Length: {len(body)}"]
+        head += [f"{name.decode()}: {value.decode()}" for name, value in headers]
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        await self.reader.readexactly(length)
+        return status
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+async def run(make_client, scenario, concurrency: int, duration: float, warmup: float) -> dict:
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    async def worker():
+        client = await make_client()
+        while (now := time.perf_counter()) < stop_at:
+            status = await client.request(*scenario())
+            if now >= measure_from:
+                latencies.append(time.perf_counter() - now)
+                statuses[status] += 1
+        await client.close()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / duration,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0) * 1000,
+        "statuses": dict(statuses),
+    }
+
+
+def load_app(arms: int, cycle_time: float):
+    """Import server.py against simulated arms and throwaway databases."""
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    os.environ.update({
+        "DOBOT_PORTS": "",
+        "SIMULATED_ARMS": str(arms),
+        "SIMULATED_CYCLE_TIME": str(cycle_time),
+        "ORDER_JOURNAL": os.path.join(workdir, "orders.db"),
+        "PRODUCT_CATALOG": os.path.join(workdir, "catalog.db"),
+    })
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    return importlib.import_module("server").app
+
+
+async def main(args) -> dict:
+    random.seed(args.seed)
+    scenario = SCENARIOS[args.scenario]
+    if args.url:
+        async def make_client():
+            client = HTTPClient(args.url)
+            await client.start()
+            return client
+        return await run(make_client, scenario, args.concurrency, args.duration, args.warmup)
+
+    asgi = ASGIClient(load_app(args.arms, args.cycle_time))
+    await asgi.startup()
+
+    async def make_client():
+        return asgi
+
+    try:
+        return await run(make_client, scenario, args.concurrency, args.duration, args.warmup)
+    finally:
+        await asgi.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test for server.py")
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='order')
+    parser.add_argument('--concurrency', type=int, default=20, help='concurrent clients')
+    parser.add_argument('--duration', type=float, default=10.0, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=1.0, help='seconds before measuring')
+    parser.add_argument('--url', help='test a running server instead of the in-process app')
+    parser.add_argument('--arms', type=int, default=2, help='simulated arms (in-process only)')
+    parser.add_argument('--cycle-time', type=float, default=0.5, help='simulated seconds per item')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    result = asyncio.run(main(args))
+    result.update(scenario=args.scenario, concurrency=args.concurrency, target=args.url or "in-process")
+    print(f"{args.scenario}: {result['requests']} requests, {result['throughput']:.0f} req/s")
+    print(f"latency p50 {result['p50_ms']:.2f} ms  p95 {result['p95_ms']:.2f} ms  "
+          f"p99 {result['p99_ms']:.2f} ms  max {result['max_ms']:.2f} ms")
+    print(f"status codes: {result['statuses']}")
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(result, file, indent=2)
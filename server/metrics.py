@@ -0,0 +1,131 @@
+import time
+from bisect import bisect_left
+from typing import Callable
+
+# Seconds; covers sub-millisecond handlers up to multi-second robot moves
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    """Label value escaping of the Prometheus text format: backslash, quote, newline."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        help = self.help.replace("\\", "\\\\").replace("\n", "\\n")
+        return [f"# HELP {self.name} {help}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labels)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, *label_values) -> None:
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self) -> list[str]:
+        return [f"{self.name}{_labels(self.labels, key)} {value}" for key, value in self.values.items()]
+
+
+class Gauge(Metric):
+    """A gauge that is set directly or read from ``read`` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), read: Callable[[], dict] | None = None) -> None:
+        super().__init__(name, help, labels)
+        self.values: dict[tuple, float] = {}
+        self.read = read
+
+    def set(self, value: float, *label_values) -> None:
+        self.values[label_values] = value
+
+    def samples(self) -> list[str]:
+        values = self.read() if self.read is not None else self.values
+        return [f"{self.name}{_labels(self.labels, key)} {value}" for key, value in values.items()]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("path",)))
+ROBOT_COMMAND_LATENCY = REGISTRY.register(Histogram(
+    "robot_command_duration_seconds", "Duration of a single robot motion command.", ("arm",)))
+
+
+def timing_middleware(paths: set[str]) -> Callable:
+    """ASGI middleware recording latency of requests to ``paths``."""
+    def factory(app):
+        async def middleware(scope, receive, send):
+            if scope["type"] != "http" or scope["path"] not in paths:
+                await app(scope, receive, send)
+                return
+            start = time.perf_counter()
+            try:
+                await app(scope, receive, send)
+            finally:
+                REQUEST_LATENCY.observe(time.perf_counter() - start, scope["path"])
+        return middleware
+    return factory
@@ -0,0 +1,270 @@
+import asyncio
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+MAX_COUNT = 10_000        # largest count a single scan may carry
+QUEUE_SIZE = 10_000       # orders waiting for the batcher
+BATCH_WINDOW = 0.2        # s, duplicates of a barcode inside it are merged
+BATCH_SIZE = 100          # barcodes per batch handed to a worker
+WORKERS = 2
+ADMIT_LIMIT = 0.9         # queue fill above which bulk requests are refused
+MAX_BULK_ITEMS = 10_000   # items accepted in one bulk request
+RATE_INTERVAL = 1.0       # s of busy batcher time per drain-rate measurement
+MAX_RETRY_AFTER = 30      # s, cap on the Retry-After hint
+
+
+@dataclass
+class Order:
+    barcode: str
+    count: int
+    priority: int = 1             # lower runs first
+    deadline: float | None = None # wall-clock time.time() the order is due by
+    received: float = field(default_factory=time.monotonic)
+    ids: list[int] = field(default_factory=list)  # journal ids merged into this order
+
+
+class OrderRejected(ValueError):
+    """The order failed validation."""
+
+
+class PipelineFull(RuntimeError):
+    """The order queue is saturated; the client should retry later."""
+
+    def __init__(self, message: str, retry_after: int = 1) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def validate_order(barcode: str, count: int, priority: int = 1, due_in: float | None = None) -> Order:
+    barcode = barcode.strip()
+    if not barcode:
+        raise OrderRejected("barcode must not be empty")
+    if not 0 < count <= MAX_COUNT:
+        raise OrderRejected(f"count must be between 1 and {MAX_COUNT}")
+    if priority < 0:
+        raise OrderRejected("priority must not be negative")
+    if due_in is not None and due_in <= 0:
+        raise OrderRejected("due_in must be positive")
+    deadline = time.time() + due_in if due_in is not None else None
+    return Order(barcode, count, priority, deadline)
+
+
+def parse_item(item) -> tuple[str, int, int, float | None]:
+    """Check the shape of one bulk item before it goes through validate_order."""
+    if not isinstance(item, dict):
+        raise OrderRejected("item must be an object")
+    barcode, count = item.get("barcode"), item.get("count")
+    priority, due_in = item.get("priority", 1), item.get("due_in")
+    if not isinstance(barcode, str) or not isinstance(count, int) or isinstance(count, bool):
+        raise OrderRejected("barcode (string) and count (integer) are required")
+    if not isinstance(priority, int) or (due_in is not None and not isinstance(due_in, (int, float))):
+        raise OrderRejected("priority must be an integer and due_in a number")
+    return barcode, count, priority, due_in
+
+
+async def iter_ndjson(chunks):
+    """Yield the items of an NDJSON byte stream as each chunk arrives.
+
+    A line that is not valid JSON is yielded as the OrderRejected it caused.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        yield [_parse_line(line) for line in lines if line.strip()]
+    if buffer.strip():
+        yield [_parse_line(buffer)]
+
+
+def _parse_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return OrderRejected(f"invalid JSON: {e}")
+
+
+def coalesce(orders: list[Order]) -> list[Order]:
+    """Merge orders with the same barcode, keeping first-seen order.
+
+    A merged order takes the most urgent priority and earliest deadline.
+    """
+    merged: dict[str, Order] = {}
+    for order in orders:
+        first = merged.get(order.barcode)
+        if first is None:
+            merged[order.barcode] = Order(
+                order.barcode, order.count, order.priority, order.deadline, order.received, list(order.ids))
+            continue
+        first.count += order.count
+        first.ids += order.ids
+        first.priority = min(first.priority, order.priority)
+        if order.deadline is not None and (first.deadline is None or order.deadline < first.deadline):
+            first.deadline = order.deadline
+    return list(merged.values())
+
+
+async def print_batch(batch: list[Order]) -> None:
+    for order in batch:
+        print({"barcode": order.barcode, "count": order.count})
+
+
+class OrderPipeline:
+    """
+    In-process order ingestion.
+
+    ``submit`` validates, waits for the order to reach the journal (if one
+    is given) and does a non-blocking put, so the HTTP handler never waits
+    for motion. A batcher task drains the queue into batches of up to
+    ``batch_size`` distinct barcodes, waiting at most ``window`` seconds
+    from the first order when the queue runs short, merges duplicate
+    barcodes and passes the batch to ``workers`` tasks that call
+    ``handle_batch``.
+    """
+
+    def __init__(
+        self,
+        handle_batch: Callable[[list[Order]], Awaitable[None]] = print_batch,
+        maxsize: int = QUEUE_SIZE,
+        window: float = BATCH_WINDOW,
+        batch_size: int = BATCH_SIZE,
+        workers: int = WORKERS,
+        journal=None,
+    ) -> None:
+        self.handle_batch = handle_batch
+        self.journal = journal
+        self.window = window
+        self.batch_size = batch_size
+        self.workers = workers
+        self.queue: asyncio.Queue[Order] = asyncio.Queue(maxsize)
+        self.batches: asyncio.Queue[list[Order]] = asyncio.Queue(workers * 2)
+        self.drain_rate = 0.0     # orders/s the batcher took off a backlogged queue
+        self._drained = 0
+        self._measured = 0.0
+        self._tasks: list[asyncio.Task] = []
+
+    async def submit(self, barcode: str, count: int, priority: int = 1, due_in: float | None = None) -> Order:
+        order = validate_order(barcode, count, priority, due_in)
+        if self.queue.full():
+            raise PipelineFull("order queue is full", self.retry_after())
+        if self.journal is not None:
+            await self.journal.append(order)
+        try:
+            self.queue.put_nowait(order)
+        except asyncio.QueueFull:
+            # The queue filled up while the journal was committing
+            if self.journal is not None:
+                self.journal.complete(order.ids, "rejected")
+            raise PipelineFull("order queue is full", self.retry_after()) from None
+        return order
+
+    async def submit_many(self, items: list, first_index: int = 0) -> list[dict]:
+        """Submit bulk items; the valid ones go to the journal as one group."""
+        results: list[dict | None] = []
+        orders: list[tuple[int, Order]] = []
+        for index, item in enumerate(items, first_index):
+            try:
+                if isinstance(item, Exception):
+                    raise item
+                if index >= MAX_BULK_ITEMS:
+                    raise OrderRejected(f"at most {MAX_BULK_ITEMS} items per request")
+                orders.append((len(results), validate_order(*parse_item(item))))
+                results.append(None)
+            except OrderRejected as e:
+                results.append({"index": index, "status": "rejected", "error": str(e)})
+        # As in submit, only what fits in the queue is journaled
+        room = max(0, self.queue.maxsize - self.queue.qsize()) if self.queue.maxsize > 0 else len(orders)
+        orders, throttled = orders[:room], orders[room:]
+        if self.journal is not None and orders:
+            await self.journal.append_many([order for _, order in orders])
+        rejected: list[int] = []
+        for position, order in orders:
+            try:
+                self.queue.put_nowait(order)
+            except asyncio.QueueFull:
+                # The queue filled up while the journal was committing
+                rejected += order.ids
+                throttled.append((position, order))
+                continue
+            results[position] = {"index": first_index + position, "status": "accepted",
+                                 "barcode": order.barcode, "count": order.count}
+        if rejected:
+            self.journal.complete(rejected, "rejected")
+        for position, _ in throttled:
+            results[position] = {"index": first_index + position, "status": "throttled",
+                                 "error": "order queue is full"}
+        return results
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    @property
+    def saturated(self) -> bool:
+        return self.depth >= self.queue.maxsize * ADMIT_LIMIT
+
+    def retry_after(self) -> int:
+        """
+        Seconds until the current queue drains at the measured rate, capped at
+        ``MAX_RETRY_AFTER``. The batcher no longer sleeps on a backlog, so
+        what limits the queue is how fast workers take batches off it.
+        """
+        if self.drain_rate <= 0:
+            return 1
+        return min(MAX_RETRY_AFTER, max(1, math.ceil(self.depth / self.drain_rate)))
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._batcher())]
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _batcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._measured = loop.time()
+        while True:
+            if self.queue.empty():
+                # Idle time says nothing about how fast a backlog drains
+                self._drained, self._measured = 0, loop.time()
+            orders = [await self.queue.get()]
+            barcodes = {orders[0].barcode}
+            closes = loop.time() + self.window
+            # Take what is already queued without waiting; only a short backlog
+            # waits, and then just for the rest of the window since the first order
+            while len(barcodes) < self.batch_size:
+                try:
+                    order = self.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = closes - loop.time()
+                    if timeout <= 0:
+                        break
+                    # asyncio.timeout, not wait_for: on 3.11 wait_for can swallow
+                    # the cancellation sent by stop()
+                    try:
+                        async with asyncio.timeout(timeout):
+                            order = await self.queue.get()
+                    except TimeoutError:
+                        break
+                orders.append(order)
+                barcodes.add(order.barcode)
+            # Waiting for a free worker is the back-pressure that fills self.queue
+            await self.batches.put(coalesce(orders))
+            self._drained += len(orders)
+            elapsed = loop.time() - self._measured
+            if elapsed >= RATE_INTERVAL:
+                self.drain_rate = self._drained / elapsed
+                self._drained, self._measured = 0, loop.time()
+
+    async def _worker(self) -> None:
+        while True:
+            batch = await self.batches.get()
+            try:
+                await self.handle_batch(batch)
+            except Exception as e:
+                print(f"order batch failed: {e}")
@@ -0,0 +1,289 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+from catalog import Product
+from metrics import ROBOT_COMMAND_LATENCY
+from orders import Order
+
+CYCLE_TIME = 6.0          # s per item until an arm has measured its own
+CYCLE_SMOOTHING = 0.2     # weight of the newest measurement in the estimate
+HISTORY = 200             # finished jobs kept for reporting
+
+# Default pick/place poses (x, y, z, r) and the safe height between them
+PICK_POSE = (200.0, -100.0, -40.0, 0.0)
+PLACE_POSE = (200.0, 100.0, -40.0, 0.0)
+LIFT_Z = 40.0
+
+
+@dataclass
+class Job:
+    id: int
+    barcode: str
+    count: int
+    priority: int
+    deadline: float | None
+    order_ids: list[int] = field(default_factory=list)
+    product: Product | None = None
+    arm: str | None = None
+    expected_start: float | None = None
+    expected_done: float | None = None
+    started: float | None = None
+    finished: float | None = None
+    error: str | None = None
+
+    @property
+    def late(self) -> bool:
+        done = self.finished or self.expected_done
+        return self.deadline is not None and done is not None and done > self.deadline
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "late": self.late}
+
+
+class Arm:
+    """
+    One robot with its own job queue.
+
+    ``execute`` is blocking and always runs on the arm's single executor
+    thread, so the thread owns the connection the same way RobotWorker does
+    in the operator UIs.
+    """
+
+    def __init__(self, name: str, cycle_time: float = CYCLE_TIME) -> None:
+        self.name = name
+        self.cycle_time = cycle_time
+        self.queue: list[tuple[int, float, int, Job]] = []
+        # Queued items per priority, and the part of them without a deadline,
+        # so placing a job does not have to walk every queue
+        self.items: dict[int, int] = {}
+        self.undated: dict[int, int] = {}
+        self.current: Job | None = None
+        self.pose: tuple[float, float, float, float] | None = None
+        self.alarm: str | None = None
+        self.wake = asyncio.Event()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    def execute(self, job: Job) -> None:
+        raise NotImplementedError
+
+    def estimate(self, job: Job) -> float:
+        return self.cycle_time * job.count
+
+    def remaining(self, now: float) -> float:
+        """Seconds until the job in progress is expected to finish."""
+        if self.current is None:
+            return 0.0
+        return max(0.0, self.current.started + self.estimate(self.current) - now)
+
+    def backlog(self, now: float) -> float:
+        """Seconds until the arm is expected to be idle."""
+        return self.remaining(now) + self.cycle_time * sum(self.items.values())
+
+    def ahead_of(self, job: Job) -> float:
+        """Seconds of queued work that would run before a newly added ``job``.
+
+        Exact except among dated jobs of the same priority, which all count
+        as ahead even when their deadline is later.
+        """
+        items = sum(count for priority, count in self.items.items() if priority <= job.priority)
+        if job.deadline is not None:
+            items -= self.undated.get(job.priority, 0)
+        return self.cycle_time * items
+
+    def push(self, job: Job) -> None:
+        heapq.heappush(self.queue, (*sort_key(job), job))
+        self.items[job.priority] = self.items.get(job.priority, 0) + job.count
+        if job.deadline is None:
+            self.undated[job.priority] = self.undated.get(job.priority, 0) + job.count
+        self.wake.set()
+
+    def pop(self) -> Job:
+        *_, job = heapq.heappop(self.queue)
+        self.items[job.priority] -= job.count
+        if job.deadline is None:
+            self.undated[job.priority] -= job.count
+        return job
+
+    def observe(self, job: Job) -> None:
+        per_item = (job.finished - job.started) / job.count
+        self.cycle_time += CYCLE_SMOOTHING * (per_item - self.cycle_time)
+
+    def telemetry(self) -> dict:
+        return {
+            "pose": self.pose,
+            "job": self.current.id if self.current else None,
+            "queue": len(self.queue),
+            "cycle_time": round(self.cycle_time, 3),
+            "alarm": self.alarm,
+        }
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+
+
+class SimulatedArm(Arm):
+    """Stands in for a robot: each item just takes ``cycle_time`` seconds."""
+
+    def __init__(self, name: str, cycle_time: float = CYCLE_TIME) -> None:
+        super().__init__(name, cycle_time)
+        self.item_time = cycle_time
+
+    def execute(self, job: Job) -> None:
+        time.sleep(self.item_time * job.count)
+
+
+class DobotArm(Arm):
+    """Picks and places each item with a Dobot connected through pydobot."""
+
+    def __init__(self, name: str, port: str, pick=PICK_POSE, place=PLACE_POSE, cycle_time: float = CYCLE_TIME) -> None:
+        super().__init__(name, cycle_time)
+        self.port = port
+        self.pick = pick
+        self.place = place
+        self.device = None
+        self.profile = None
+
+    def _connect(self):
+        if self.device is None:
+            from pydobot import Dobot
+            self.device = Dobot(port=self.port)
+        return self.device
+
+    def execute(self, job: Job) -> None:
+        device = self._connect()
+        pick, place = self.pick, self.place
+        if job.product is not None:
+            pick, place = job.product.pick, job.product.place
+            profile = (job.product.velocity, job.product.acceleration)
+            if profile != self.profile:
+                device.speed(*profile)
+                self.profile = profile
+        for _ in range(job.count):
+            self._transfer(device, pick, place)
+            # One pose read per item keeps telemetry current off the same thread
+            self.pose = tuple(device.pose()[:4])
+
+    def _move(self, device, x, y, z, r) -> None:
+        start = time.perf_counter()
+        device.move_to(x, y, z, r, wait=True)
+        ROBOT_COMMAND_LATENCY.observe(time.perf_counter() - start, self.name)
+
+    def _transfer(self, device, pick, place) -> None:
+        x, y, z, r = pick
+        self._move(device, x, y, LIFT_Z, r)
+        self._move(device, x, y, z, r)
+        device.suck(True)
+        self._move(device, x, y, LIFT_Z, r)
+        x, y, z, r = place
+        self._move(device, x, y, LIFT_Z, r)
+        self._move(device, x, y, z, r)
+        device.suck(False)
+        self._move(device, x, y, LIFT_Z, r)
+
+    def close(self) -> None:
+        if self.device is not None:
+            self.device.close()
+        super().close()
+
+
+def sort_key(job: Job) -> tuple[int, float, int]:
+    """Priority first, then earliest deadline, then arrival."""
+    return (job.priority, job.deadline if job.deadline is not None else math.inf, job.id)
+
+
+class Scheduler:
+    """
+    Turns orders into jobs and keeps one priority queue per arm.
+
+    A job goes to the arm where it is expected to finish first, counting the
+    work in progress and every queued job that would run before it. Cycle
+    times are learned per arm from finished jobs.
+    """
+
+    def __init__(self, arms: list[Arm], journal=None, catalog=None) -> None:
+        self.arms = {arm.name: arm for arm in arms}
+        self.journal = journal
+        self.catalog = catalog
+        self.finished: list[Job] = []
+        self._ids = itertools.count(1)
+        self._tasks: list[asyncio.Task] = []
+
+    async def submit(self, orders: list[Order]) -> list[Job]:
+        """Batch handler for ``OrderPipeline``."""
+        return [self.add(order) for order in orders]
+
+    def add(self, order: Order) -> Job:
+        job = Job(next(self._ids), order.barcode, order.count, order.priority, order.deadline, list(order.ids))
+        # Barcodes missing from the catalog fall back to the arm's default poses
+        if self.catalog is not None:
+            job.product = self.catalog.get(order.barcode)
+        now = time.time()
+        arm = min(self.arms.values(), key=lambda a: a.remaining(now) + a.ahead_of(job) + a.estimate(job))
+        job.arm = arm.name
+        arm.push(job)
+        return job
+
+    def _forecast(self, arm: Arm, now: float) -> None:
+        # Only for reporting: sorting every queue on each add costs too much under load
+        t = now + arm.remaining(now)
+        for *_, job in sorted(arm.queue):
+            job.expected_start = t
+            t += arm.estimate(job)
+            job.expected_done = t
+
+    def report(self) -> dict:
+        now = time.time()
+        arms = []
+        for arm in self.arms.values():
+            self._forecast(arm, now)
+            arms.append({
+                "name": arm.name,
+                "cycle_time": arm.cycle_time,
+                "backlog": arm.backlog(now),
+                "current": arm.current.as_dict() if arm.current else None,
+                "queue": [job.as_dict() for *_, job in sorted(arm.queue)],
+            })
+        return {"time": now, "arms": arms, "finished": [job.as_dict() for job in self.finished[-20:]]}
+
+    def telemetry(self) -> dict:
+        return {name: arm.telemetry() for name, arm in self.arms.items()}
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run(arm)) for arm in self.arms.values()]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for arm in self.arms.values():
+            arm.close()
+
+    async def _run(self, arm: Arm) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            while not arm.queue:
+                arm.wake.clear()
+                await arm.wake.wait()
+            job = arm.pop()
+            arm.current = job
+            job.started = time.time()
+            try:
+                await loop.run_in_executor(arm.executor, arm.execute, job)
+            except Exception as e:
+                job.error = str(e)
+                print(f"job {job.id} on {arm.name} failed: {e}")
+            arm.alarm = job.error
+            job.finished = time.time()
+            arm.current = None
+            if job.error is None:
+                arm.observe(job)
+                if self.journal is not None:
+                    self.journal.complete(job.order_ids)
+            self.finished.append(job)
+            del self.finished[:-HISTORY]
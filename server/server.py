@@ -1,13 +1,131 @@
-from litestar import Litestar, get, post
+import os
+import time
+
+from litestar import Litestar, Request, Response, WebSocket, get, post, websocket
+from litestar.exceptions import SerializationException, TooManyRequestsException, ValidationException
+
+import metrics
+from catalog import ProductCatalog
+from journal import OrderJournal
+from orders import OrderPipeline, OrderRejected, PipelineFull, coalesce, iter_ndjson
+from scheduler import DobotArm, Scheduler, SimulatedArm
+from telemetry import TelemetryHub
+
+# Comma separated serial ports, one per arm; without any the cell is simulated
+DOBOT_PORTS = [port for port in os.environ.get("DOBOT_PORTS", "").split(",") if port]
+SIMULATED_ARMS = int(os.environ.get("SIMULATED_ARMS", "2"))
+SIMULATED_CYCLE_TIME = float(os.environ.get("SIMULATED_CYCLE_TIME", "6.0"))
+ORDER_JOURNAL = os.environ.get("ORDER_JOURNAL", "orders.db")
+PRODUCT_CATALOG = os.environ.get("PRODUCT_CATALOG", "catalog.db")
+# Pipeline stages analizaVideo.py reports as <stage>_ms; other *_ms keys (latency) are not stages
+VISION_STAGES = ("capture", "process", "display")
+
+arms = [DobotArm(f"dobot{i}", port) for i, port in enumerate(DOBOT_PORTS)]
+arms = arms or [SimulatedArm(f"sim{i}", SIMULATED_CYCLE_TIME) for i in range(SIMULATED_ARMS)]
+journal = OrderJournal(ORDER_JOURNAL)
+catalog = ProductCatalog(PRODUCT_CATALOG)
+scheduler = Scheduler(arms, journal, catalog)
+pipeline = OrderPipeline(scheduler.submit, journal=journal)
+
+hub = TelemetryHub()
+hub.add_source("arms", scheduler.telemetry)
+hub.add_source("orders", lambda: {"depth": pipeline.depth})
+
+def vision_stages() -> dict:
+    data = hub.values.get("vision", {})
+    return {(stage,): data[f"{stage}_ms"] / 1000 for stage in VISION_STAGES if f"{stage}_ms" in data}
+
+ORDERS = metrics.REGISTRY.register(metrics.Counter(
+    "orders_total", "Orders submitted, by result (accepted, rejected, throttled).", ("result",)))
+metrics.REGISTRY.register(metrics.Gauge(
+    "order_queue_depth", "Orders waiting for the batcher.",
+    read=lambda: {(): pipeline.depth}))
+metrics.REGISTRY.register(metrics.Gauge(
+    "robot_queue_lag_jobs", "Jobs assigned to an arm but not started.", ("arm",),
+    read=lambda: {(name,): len(arm.queue) for name, arm in scheduler.arms.items()}))
+metrics.REGISTRY.register(metrics.Gauge(
+    "robot_backlog_seconds", "Expected seconds until an arm is idle.", ("arm",),
+    read=lambda: {(name,): arm.backlog(time.time()) for name, arm in scheduler.arms.items()}))
+metrics.REGISTRY.register(metrics.Gauge(
+    "vision_fps", "Frames per second reported by the vision process.",
+    read=lambda: {(): hub.values["vision"]["fps"]} if "fps" in hub.values.get("vision", {}) else {}))
+metrics.REGISTRY.register(metrics.Gauge(
+    "vision_stage_seconds", "Per-stage frame time reported by the vision process.", ("stage",),
+    read=vision_stages))
 
 @get("/test")
 async def get_book(book_id: int) -> dict[str, int]:
     return {"book_id": book_id}
 
 @post("/order-count")
-async def order_count(barcode: str, count: int) -> dict[str, int]:
-    data = {"barcode": barcode, "count": count}
-    print(data)
-    return data
+async def order_count(barcode: str, count: int, priority: int = 1, due_in: float | None = None) -> dict[str, str | int]:
+    try:
+        order = await pipeline.submit(barcode, count, priority, due_in)
+    except OrderRejected as e:
+        ORDERS.inc(1, "rejected")
+        raise ValidationException(str(e)) from e
+    except PipelineFull as e:
+        ORDERS.inc(1, "throttled")
+        raise TooManyRequestsException(str(e), headers={"Retry-After": str(e.retry_after)}) from e
+    ORDERS.inc(1, "accepted")
+    return {"barcode": order.barcode, "count": order.count}
+
+@post("/orders/bulk")
+async def bulk_orders(request: Request) -> Response[list[dict]]:
+    """Accept a JSON array or an NDJSON stream of orders, one result per item."""
+    if pipeline.saturated:
+        raise TooManyRequestsException(
+            "order pipeline is saturated", headers={"Retry-After": str(pipeline.retry_after())})
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        results = []
+        async for items in iter_ndjson(request.stream()):
+            results += await pipeline.submit_many(items, len(results))
+    else:
+        try:
+            items = await request.json()
+        except SerializationException as e:
+            raise ValidationException(f"invalid JSON: {e}") from e
+        if not isinstance(items, list):
+            raise ValidationException("body must be a JSON array or NDJSON")
+        results = await pipeline.submit_many(items)
+    for result in results:
+        ORDERS.inc(1, result["status"])
+    headers = {}
+    if any(result["status"] == "throttled" for result in results):
+        headers["Retry-After"] = str(pipeline.retry_after())
+    return Response(results, headers=headers)
+
+async def open_catalog() -> None:
+    catalog.open()
+    print(f"preloaded {catalog.preload()} products")
+
+async def recover_orders() -> None:
+    """Requeue orders accepted before a restart whose jobs never finished."""
+    pending = await journal.pending()
+    if pending:
+        print(f"recovered {len(pending)} unfinished orders")
+        await scheduler.submit(coalesce(pending))
+
+@get("/metrics", media_type="text/plain; version=0.0.4")
+async def metrics_endpoint() -> str:
+    return metrics.REGISTRY.render()
+
+@get("/schedule")
+async def schedule() -> dict:
+    return scheduler.report()
+
+@post("/vision")
+async def vision(data: dict[str, float]) -> None:
+    hub.set("vision", data)
+
+@websocket("/telemetry")
+async def telemetry_stream(socket: WebSocket, hz: float = 10.0) -> None:
+    await socket.accept()
+    await hub.stream(socket, hz)
 
-app = Litestar([get_book, order_count])
+app = Litestar(
+    [get_book, order_count, bulk_orders, schedule, vision, telemetry_stream, metrics_endpoint],
+    middleware=[metrics.timing_middleware({"/test", "/order-count", "/orders/bulk"})],
+    on_startup=[open_catalog, journal.start, recover_orders, scheduler.start, pipeline.start, hub.start],
+    on_shutdown=[hub.stop, pipeline.stop, scheduler.stop, journal.stop, catalog.close],
+)
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import time
+from typing import Any, Callable
+
+from litestar import WebSocket
+from litestar.exceptions import WebSocketDisconnect
+
+SAMPLE_HZ = 10.0          # upstream sampling rate
+DEFAULT_CLIENT_HZ = 10.0  # frames per second sent to a client unless it asks otherwise
+MAX_CLIENT_HZ = 30.0
+SEND_TIMEOUT = 5.0        # s a send may block before the client counts as stalled
+
+
+class TelemetryHub:
+    """
+    Samples cell state once and fans it out to any number of WebSockets.
+
+    Sources are cheap callables reading values the arms, the order pipeline
+    and the vision process already keep in memory, so viewers never reach
+    the serial line. A snapshot is encoded once as compact JSON and only
+    published when it changed. Each client sends at its own rate and always
+    gets the newest frame; frames it was too slow for are simply skipped.
+    A client that disconnects, fails a send or stops reading for
+    ``SEND_TIMEOUT`` seconds is dropped.
+    """
+
+    def __init__(self, sample_hz: float = SAMPLE_HZ) -> None:
+        self.sample_hz = sample_hz
+        self.sources: dict[str, Callable[[], Any]] = {}
+        self.values: dict[str, Any] = {}
+        self.frame = "{}"
+        self.version = 0
+        self.clients = 0
+        self._body = ""
+        self._updated = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def add_source(self, name: str, read: Callable[[], Any]) -> None:
+        self.sources[name] = read
+
+    def set(self, name: str, value: Any) -> None:
+        """Store a pushed value (e.g. a vision measurement) for the next sample."""
+        self.values[name] = value
+
+    def sample(self) -> None:
+        snapshot = {name: read() for name, read in self.sources.items()}
+        snapshot.update(self.values)
+        body = json.dumps(snapshot, separators=(",", ":"), default=str)
+        if body == self._body:
+            return
+        self._body = body
+        self.version += 1
+        header = {"seq": self.version, "t": round(time.time(), 3)}
+        self.frame = json.dumps({**header, **snapshot}, separators=(",", ":"), default=str)
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._sampler())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _sampler(self) -> None:
+        period = 1 / self.sample_hz
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"telemetry sample failed: {e}")
+            await asyncio.sleep(period)
+
+    async def stream(self, socket: WebSocket, hz: float = DEFAULT_CLIENT_HZ) -> None:
+        period = 1 / min(max(hz, 0.1), MAX_CLIENT_HZ)
+        self.clients += 1
+        # The reader notices a disconnect even while no frame is being sent
+        sender = asyncio.create_task(self._send_frames(socket, period))
+        reader = asyncio.create_task(self._read_until_closed(socket))
+        try:
+            await asyncio.wait({sender, reader}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.clients -= 1
+            for task in (sender, reader):
+                task.cancel()
+            for result in await asyncio.gather(sender, reader, return_exceptions=True):
+                if isinstance(result, Exception) and not isinstance(result, WebSocketDisconnect):
+                    print(f"telemetry client dropped: {result!r}")
+            try:
+                await socket.close()
+            except Exception:
+                pass
+
+    async def _send_frames(self, socket: WebSocket, period: float) -> None:
+        seen = 0
+        while True:
+            while self.version == seen:
+                await self._updated.wait()
+            seen = self.version
+            async with asyncio.timeout(SEND_TIMEOUT):
+                await socket.send_text(self.frame)
+            await asyncio.sleep(period)
+
+    @staticmethod
+    async def _read_until_closed(socket: WebSocket) -> None:
+        while True:
+            await socket.receive_data("text")
@@ -0,0 +1,352 @@
+import argparse
+import bisect
+import heapq
+import itertools
+import random
+import time
+from collections import deque
+
+import numpy as np
+
+from stations import MotionModel, Station, load_stations
+from timeline import Recorder
+
+
+# 2 cm miara
+LINE_WIDTH = 1440
+BOX_SIZE = 15
+SPEED = 5
+INTERVAL = 250  # co ile ms taśma przesuwa się o SPEED
+ARRIVAL_INTERVAL = 5.0  # s między losowymi pudełkami (przycisk "random")
+
+MACHINE_POSITION_REVERSED = [215, 210, 160, 165, 225, 160, 160]
+MACHINE_POSITION = [160, 160, 255, 165, 160, 210, 210]
+STATIONS = 8
+EPSILON = 1e-6  # px, żeby błędy zaokrągleń nie blokowały wolnego miejsca
+
+
+class Simulation:
+    """Kolejka zdarzeń (heap) z czasem symulacji w sekundach, bez Tk."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.events = []
+        self.counter = itertools.count()
+
+    def at(self, when, action, *args):
+        heapq.heappush(self.events, (when, next(self.counter), action, args))
+
+    def after(self, delay, action, *args):
+        self.at(self.now + delay, action, *args)
+
+    def run(self, until=None):
+        """Wykonuje zdarzenia do czasu ``until`` (albo do końca kolejki)."""
+        events = self.events
+        while events and (until is None or events[0][0] <= until):
+            when, _, action, args = heapq.heappop(events)
+            self.now = when
+            action(*args)
+        if until is not None:
+            self.now = max(self.now, until)
+
+
+class Occupancy:
+    """
+    Zajętość taśmy: posortowane lewe krawędzie pudełek w układzie taśmy.
+    Pozycja w tym układzie się nie zmienia, więc lista jest posortowana
+    raz na zawsze, a pytania o wolne miejsce to bisect bez canvas.
+    """
+
+    def __init__(self, gap):
+        # pudełka bliżej niż gap (BOX_SIZE + 1) kolidują
+        self.gap = gap
+        self.belt = []
+
+    def __len__(self):
+        return len(self.belt)
+
+    def add(self, belt):
+        bisect.insort(self.belt, belt)
+
+    def drop_until(self, belt):
+        """Usuwa pudełka z pozycją <= belt (już za linią), zwraca ile."""
+        k = bisect.bisect_right(self.belt, belt)
+        del self.belt[:k]
+        return k
+
+    def free(self, belt):
+        i = bisect.bisect_right(self.belt, belt - self.gap + EPSILON)
+        return i == len(self.belt) or self.belt[i] >= belt + self.gap - EPSILON
+
+    def next_free(self, belt):
+        """Najmniejsza pozycja >= belt, w której nowe pudełko się zmieści."""
+        i = bisect.bisect_right(self.belt, belt - self.gap + EPSILON)
+        while i < len(self.belt) and self.belt[i] < belt + self.gap - EPSILON:
+            belt = self.belt[i] + self.gap
+            i += 1
+        return belt
+
+
+class LineModel(Simulation):
+    """
+    Model linii: taśma jedzie w lewo ze stałą prędkością, pudełka czekają
+    w kolejce stacji (WAIT_BOX), wolne ramię stacji (stations.Station)
+    przenosi pudełko w czasie swojego cyklu i kładzie je na taśmie, kiedy
+    miejsce przed stacją jest wolne; do tego czasu ramię jest zablokowane.
+
+    Pudełka na taśmie są w tablicach NumPy: pozycja w układzie taśmy
+    (x(t) = belt - velocity * t) się nie zmienia, więc ruch nic nie kosztuje,
+    a te, które wyjechały, są usuwane wszystkie naraz. Zajętość jest w
+    Occupancy, więc stacja z kolejką nie sprawdza co INTERVAL, tylko budzi
+    się dokładnie wtedy, kiedy miejsce przed nią się zwolni.
+    """
+
+    def __init__(self, machine_position=MACHINE_POSITION, speed=SPEED, interval=INTERVAL,
+                 box_size=BOX_SIZE, stations=STATIONS, seed=None, capacity=1024, cycle_time=0.0,
+                 recorder=None):
+        super().__init__()
+        self.velocity = speed * 1000 / interval  # px/s
+        self.box_size = box_size
+        if isinstance(stations, int):
+            # bez modelu ruchu: stały czas cyklu (0 = pudełko od razu na taśmie),
+            # jeden dla wszystkich stacji albo lista po jednym na stację
+            positions = [sum(machine_position[:i + 1]) for i in range(stations)]
+            cycle_times = list(cycle_time) if isinstance(cycle_time, (list, tuple)) else [cycle_time] * stations
+            if len(cycle_times) != stations:
+                raise ValueError(f"cycle_time: {len(cycle_times)} wartości na {stations} stacji")
+            stations = [Station(x, cycle_time=c) for x, c in zip(positions, cycle_times)]
+        self.stations = stations
+        self.positions = [station.position for station in stations]
+        self.queues = [deque() for _ in self.positions]
+        # pudełka stacji, których jeszcze nie ma na taśmie: w kolejce
+        # i trzymane przez zablokowane ramię (st.holding)
+        self.waiting = [0] * len(self.positions)
+        # pole pod wykresem długości kolejki -> średnia długość kolejki
+        self.queue_area = [0.0] * len(self.positions)
+        self.queue_since = [0.0] * len(self.positions)
+        self.ids = itertools.count()
+        self.random = random.Random(seed)
+        self.listeners = []
+        self.placed = 0
+        self.delivered = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_queue = [0] * len(self.positions)
+        # pudełka na taśmie, pierwsze self.count wierszy
+        self.count = 0
+        self.box_id = np.empty(capacity, dtype=np.int64)
+        self.box_station = np.empty(capacity, dtype=np.int16)
+        self.box_belt = np.empty(capacity)
+        self.box_arrived = np.empty(capacity)
+        self.box_placed = np.empty(capacity)
+        self.next_exit = float("inf")
+        self.occupancy = Occupancy(box_size + 1)
+        # timeline.Recorder albo None (wtedy nic nie jest zapisywane)
+        self.recorder = recorder
+
+    @property
+    def wait_box(self):
+        return list(self.waiting)
+
+    def x(self):
+        """Lewa krawędź każdego pudełka na taśmie teraz."""
+        return self.box_belt[:self.count] - self.velocity * self.now
+
+    def notify(self, event, data):
+        for listener in self.listeners:
+            listener(event, data)
+
+    def cull(self):
+        """Usuwa naraz wszystkie pudełka, które wyjechały za lewą krawędź."""
+        if self.now < self.next_exit:
+            return
+        n = self.count
+        keep = self.box_belt[:n] + self.box_size > self.velocity * self.now
+        gone = self.box_id[:n][~keep]
+        kept = int(keep.sum())
+        for column in (self.box_id, self.box_station, self.box_belt, self.box_arrived, self.box_placed):
+            column[:kept] = column[:n][keep]
+        self.count = kept
+        self.occupancy.drop_until(self.velocity * self.now - self.box_size)
+        self.delivered += len(gone)
+        self.next_exit = (self.box_belt[:kept].min() + self.box_size) / self.velocity if kept else float("inf")
+        self.notify("leave", gone)
+
+    def slot_free(self, station):
+        self.cull()
+        return self.occupancy.free(self.positions[station] + self.velocity * self.now)
+
+    def next_free_time(self, station):
+        """Kiedy najwcześniej miejsce przed stacją będzie wolne (bez nowych pudełek)."""
+        x = self.positions[station]
+        belt = self.occupancy.next_free(x + self.velocity * self.now)
+        return max(self.now, (belt - x) / self.velocity)
+
+    def queue_changed(self, station):
+        """Wołane przed każdą zmianą kolejki albo listy trzymanych pudełek stacji."""
+        self.queue_area[station] += self.waiting[station] * (self.now - self.queue_since[station])
+        self.queue_since[station] = self.now
+
+    def add_box(self, station):
+        st = self.stations[station]
+        queue = self.queues[station]
+        if st.buffer is not None and len(queue) >= st.buffer:
+            st.rejected += 1
+            if self.recorder is not None:
+                self.recorder.reject(self.now, station)
+            return None
+        box = (next(self.ids), self.now, None)
+        self.queue_changed(station)
+        queue.append(box)
+        self.waiting[station] += 1
+        self.dispatch(station)
+        self.max_queue[station] = max(self.max_queue[station], self.waiting[station])
+        return box[0]
+
+    def dispatch(self, station):
+        """Wolne ramiona biorą pudełka z kolejki."""
+        st = self.stations[station]
+        queue = self.queues[station]
+        while st.idle and queue:
+            self.queue_changed(station)
+            id, arrived, _ = queue.popleft()
+            self.waiting[station] -= 1
+            st.idle -= 1
+            cycle = st.sample(self.random)
+            st.working += cycle
+            self.after(cycle, self.picked, station, (id, arrived, self.now))
+
+    def picked(self, station, box):
+        st = self.stations[station]
+        self.queue_changed(station)
+        st.holding.append((box, self.now))
+        self.waiting[station] += 1
+        if not st.retrying:
+            self.try_place(station)
+        self.max_queue[station] = max(self.max_queue[station], self.waiting[station])
+
+    def try_place(self, station):
+        st = self.stations[station]
+        if st.holding and self.slot_free(station):
+            self.queue_changed(station)
+            box, since = st.holding.pop(0)
+            self.waiting[station] -= 1
+            st.blocked += self.now - since
+            self.place(station, box, since)
+            st.idle += 1
+            self.dispatch(station)
+        if st.holding:
+            # Inne stacje mogły w międzyczasie położyć pudełka, więc liczymy od nowa
+            st.retrying = True
+            self.at(self.next_free_time(station), self.try_place, station)
+        else:
+            st.retrying = False
+
+    def grow(self):
+        for name in ("box_id", "box_station", "box_belt", "box_arrived", "box_placed"):
+            column = getattr(self, name)
+            bigger = np.empty(len(column) * 2, dtype=column.dtype)
+            bigger[:self.count] = column[:self.count]
+            setattr(self, name, bigger)
+
+    def place(self, station, box, picked):
+        id, arrived, started = box
+        if self.count == len(self.box_id):
+            self.grow()
+        i = self.count
+        belt = self.positions[station] + self.velocity * self.now
+        self.box_id[i] = id
+        self.box_station[i] = station
+        self.box_belt[i] = belt
+        self.box_arrived[i] = arrived
+        self.box_placed[i] = self.now
+        self.count += 1
+        self.occupancy.add(belt)
+        wait = self.now - arrived
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.placed += 1
+        # Pudełko znika, kiedy cała wyjedzie za lewą krawędź linii
+        leaves = (belt + self.box_size) / self.velocity
+        self.next_exit = min(self.next_exit, leaves)
+        if self.recorder is not None:
+            self.recorder.box(id, station, arrived, started, picked, self.now, leaves)
+        self.notify("place", (id, station, belt))
+
+    def run(self, until=None):
+        super().run(until)
+        self.cull()
+
+    def start_arrivals(self, interval=ARRIVAL_INTERVAL, poisson=False):
+        """
+        Co ``interval`` s pudełko na losowej stacji, jak przycisk "random";
+        z ``poisson`` odstępy są losowe (wykładnicze) ze średnią ``interval``.
+        """
+        self.add_box(self.random.randrange(len(self.positions)))
+        delay = self.random.expovariate(1 / interval) if poisson else interval
+        self.after(delay, self.start_arrivals, interval, poisson)
+
+    def report(self):
+        for station in range(len(self.positions)):
+            self.queue_changed(station)
+        capacity = [st.arms * self.now for st in self.stations]
+        utilisation = [min(1.0, st.working / c) if c else 0.0 for st, c in zip(self.stations, capacity)]
+        blocked = [st.blocked / c if c else 0.0 for st, c in zip(self.stations, capacity)]
+        # wąskie gardło: stacja, której ramiona najrzadziej są wolne
+        busy = [u + b for u, b in zip(utilisation, blocked)]
+        return {
+            "time": self.now,
+            "placed": self.placed,
+            "delivered": self.delivered,
+            "on_line": self.count,
+            "wait_box": self.wait_box,
+            "max_queue": self.max_queue,
+            "mean_wait": self.total_wait / self.placed if self.placed else 0.0,
+            "max_wait": self.max_wait,
+            "throughput_per_hour": self.delivered / self.now * 3600 if self.now else 0.0,
+            "mean_queue": [area / self.now if self.now else 0.0 for area in self.queue_area],
+            "utilisation": utilisation,
+            "blocked": blocked,
+            "rejected": [st.rejected for st in self.stations],
+            "cycle_time": [st.base_time if st.cycle_time is None else st.cycle_time for st in self.stations],
+            "bottleneck": busy.index(max(busy)) if self.now else None,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Symulacja linii bez okna")
+    parser.add_argument("--hours", type=float, default=24.0, help="czas symulacji")
+    parser.add_argument("--arrival-interval", type=float, default=ARRIVAL_INTERVAL, help="s między pudełkami")
+    parser.add_argument("--speed", type=float, default=SPEED, help="px na INTERVAL")
+    parser.add_argument("--cycle-time", type=float, default=0.0, help="s pracy robota na pudełko")
+    parser.add_argument("--motion", choices=["ptp", "cp"], help="czas cyklu z modelu ruchu Dobota zamiast --cycle-time")
+    parser.add_argument("--arms", type=int, default=1, help="ramion na stację (z --motion)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="rozrzut czasu cyklu (z --motion)")
+    parser.add_argument("--stations-file", help="stacje z pliku JSON (patrz stations.load_stations)")
+    parser.add_argument("--poisson", action="store_true", help="losowe odstępy między pudełkami")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--record", metavar="NPZ", help="zapisz przebieg (pudełka i zdarzenia stacji) do pliku .npz")
+    args = parser.parse_args()
+
+    stations = STATIONS
+    positions = [sum(MACHINE_POSITION[:i + 1]) for i in range(STATIONS)]
+    if args.stations_file:
+        stations = load_stations(args.stations_file, positions)
+    elif args.motion:
+        stations = [Station(x, args.arms, MotionModel(args.motion), jitter=args.jitter) for x in positions]
+    recorder = Recorder() if args.record else None
+    model = LineModel(speed=args.speed, seed=args.seed, cycle_time=args.cycle_time, stations=stations, recorder=recorder)
+    model.start_arrivals(args.arrival_interval, args.poisson)
+    started = time.perf_counter()
+    model.run(until=args.hours * 3600)
+    elapsed = time.perf_counter() - started
+    for key, value in model.report().items():
+        print(f"{key}: {value}")
+    print(f"{args.hours:g} h symulacji w {elapsed:.2f} s")
+    if recorder is not None:
+        summary = recorder.save(args.record, hours=args.hours, seed=args.seed)
+        print(f"{args.record}: {summary['boxes']} pudełek, odrzucone {summary['rejected']}")
+
+
+if __name__ == "__main__":
+    main()
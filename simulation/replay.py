@@ -0,0 +1,205 @@
+import argparse
+import asyncio
+import heapq
+import json
+import sqlite3
+import time
+import zlib
+
+from engine import MACHINE_POSITION, STATIONS, LineModel
+from stations import load_stations
+from timeline import Recorder
+
+BATCH = 1000  # wierszy czytanych z bazy naraz
+
+
+# Źródła zdarzeń. Każde to generator (czas, rodzaj, dane) rosnący w czasie,
+# czytany po kawałku, więc tygodnie historii nie lądują w pamięci.
+
+def journal_orders(path, since=None):
+    """
+    Zamówienia z dziennika serwera (server/orders.db), z czasem przyjęcia.
+    Pomija odrzucone (status 'rejected': zapisane, ale odesłane z 429).
+    """
+    db = sqlite3.connect(path)
+    try:
+        cursor = db.execute(
+            "SELECT created, barcode, count FROM orders WHERE created IS NOT NULL AND created >= ? "
+            "AND status != 'rejected' ORDER BY id",
+            (since or 0,))
+        while rows := cursor.fetchmany(BATCH):
+            for created, barcode, count in rows:
+                yield created, "order", (barcode, count)
+    finally:
+        db.close()
+
+
+def telemetry_cycles(path):
+    """
+    Czasy cyklu ramion z nagranej telemetrii (jedna ramka JSON z /telemetry
+    na linię); zdarzenie tylko wtedy, gdy czas cyklu ramienia się zmienił.
+    """
+    last = {}
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            frame = json.loads(line)
+            for arm, state in frame.get("arms", {}).items():
+                cycle_time = state.get("cycle_time")
+                if cycle_time is not None and last.get(arm) != cycle_time:
+                    last[arm] = cycle_time
+                    yield frame["t"], "cycle", (arm, cycle_time)
+
+
+def telemetry_arms(path):
+    """Nazwy ramion z nagranej telemetrii, w kolejności pojawienia się."""
+    arms = {}
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                arms.update(dict.fromkeys(json.loads(line).get("arms", {})))
+    return list(arms)
+
+
+def ndjson_events(path):
+    """Dowolne zdarzenia: {"t": ..., "type": "order"|"cycle", ...} na linię."""
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if event["type"] == "order":
+                yield event["t"], "order", (event["barcode"], event.get("count", 1))
+            elif event["type"] == "cycle":
+                yield event["t"], "cycle", (event["arm"], event["cycle_time"])
+
+
+class Replay:
+    """
+    Podaje nagrane zdarzenia do modelu linii w jego czasie. W kolejce modelu
+    jest zawsze tylko następne zdarzenie ze strumienia, a kolejne jest
+    czytane dopiero, kiedy to się wykona.
+    """
+
+    def __init__(self, model, sources, stations=None, arms=None, routes=None):
+        self.model = model
+        self.events = heapq.merge(*sources, key=lambda event: event[0])
+        self.stations = stations or {}  # kod kreskowy -> stacja
+        self.arms = arms or {}  # ramię -> stacja
+        # stacje, do których trafiają zamówienia (np. tylko te ze zmierzonym ramieniem)
+        self.routes = routes or list(range(len(model.positions)))
+        self.origin = None
+        self.orders = 0
+        self.boxes = 0
+
+    def station_for(self, barcode):
+        if barcode not in self.stations:
+            self.stations[barcode] = self.routes[zlib.crc32(barcode.encode()) % len(self.routes)]
+        return self.stations[barcode]
+
+    def arm_station(self, arm):
+        if arm not in self.arms:
+            self.arms[arm] = len(self.arms) % len(self.model.positions)
+        return self.arms[arm]
+
+    def start(self):
+        self.schedule_next()
+
+    def schedule_next(self):
+        event = next(self.events, None)
+        if event is None:
+            return
+        when, kind, data = event
+        if self.origin is None:
+            # czas symulacji 0 = pierwsze nagrane zdarzenie
+            self.origin = when - self.model.now
+        self.model.at(max(self.model.now, when - self.origin), self.apply, kind, data)
+
+    def apply(self, kind, data):
+        if kind == "order":
+            barcode, count = data
+            station = self.station_for(barcode)
+            for _ in range(count):
+                self.model.add_box(station)
+            self.orders += 1
+            self.boxes += count
+        elif kind == "cycle":
+            arm, cycle_time = data
+            self.model.stations[self.arm_station(arm)].cycle_time = cycle_time
+        self.schedule_next()
+
+
+async def record_telemetry(url, path):
+    """Nagrywa ramki z /telemetry serwera do pliku NDJSON (do Ctrl-C)."""
+    import websockets
+    async with websockets.connect(url) as socket:
+        with open(path, "a") as file:
+            async for message in socket:
+                file.write(message + "\n")
+                file.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Odtwarzanie prawdziwych zamówień i czasów cyklu w symulacji")
+    parser.add_argument("--journal", help="dziennik zamówień serwera (orders.db)")
+    parser.add_argument("--since", type=float, help="tylko zamówienia od tego czasu (time.time())")
+    parser.add_argument("--telemetry", help="nagrana telemetria (NDJSON), źródło czasów cyklu")
+    parser.add_argument("--events", nargs="*", default=[], help="pliki NDJSON ze zdarzeniami")
+    parser.add_argument("--record", metavar="URL", help="zamiast odtwarzać nagrywaj telemetrię z URL do --telemetry")
+    parser.add_argument("--stations", type=int, help=f"liczba stacji (domyślnie: ramiona z telemetrii albo {STATIONS})")
+    parser.add_argument("--stations-file", help="ramiona i modele ruchu stacji (patrz stations.load_stations)")
+    parser.add_argument("--view", action="store_true", help="pokaż w oknie Tk zamiast liczyć bez okna")
+    parser.add_argument("--speedup", type=float, default=100.0, help="przyspieszenie w oknie")
+    parser.add_argument("--timeline", metavar="NPZ", help="zapisz przebieg odtworzenia do pliku .npz")
+    args = parser.parse_args()
+
+    if args.record:
+        if not args.telemetry:
+            parser.error("--record wymaga --telemetry (plik, do którego zapisywać)")
+        try:
+            asyncio.run(record_telemetry(args.record, args.telemetry))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    sources = [ndjson_events(path) for path in args.events]
+    if args.journal:
+        sources.append(journal_orders(args.journal, args.since))
+    if args.telemetry:
+        sources.append(telemetry_cycles(args.telemetry))
+    # Bez ramienia z telemetrii stacja miałaby czas cyklu 0, więc zamówienia
+    # idą tylko do stacji, którym przypisano nagrane ramię
+    arms = telemetry_arms(args.telemetry) if args.telemetry else []
+    count = args.stations or len(arms) or STATIONS
+    stations = count
+    if args.stations_file:
+        stations = load_stations(args.stations_file, [sum(MACHINE_POSITION[:i + 1]) for i in range(count)])
+    recorder = Recorder() if args.timeline else None
+    model = LineModel(stations=stations, recorder=recorder)
+    arm_stations = {arm: i % count for i, arm in enumerate(arms)}
+    routes = sorted(set(arm_stations.values())) if arms and not args.stations_file else None
+    replay = Replay(model, sources, arms=arm_stations, routes=routes)
+    replay.start()
+
+    if args.view:
+        import tkinter as tk
+        from simulation import ProductionLineApp
+        root = tk.Tk()
+        ProductionLineApp(root, model, args.speedup)
+        root.mainloop()
+        return
+
+    started = time.perf_counter()
+    model.run()
+    elapsed = time.perf_counter() - started
+    print(f"{replay.orders} zamówień, {replay.boxes} pudełek, {model.now / 3600:.1f} h w {elapsed:.2f} s")
+    for key, value in model.report().items():
+        print(f"{key}: {value}")
+    if recorder is not None:
+        summary = recorder.save(args.timeline, orders=replay.orders)
+        print(f"{args.timeline}: {summary['boxes']} pudełek, odrzucone {summary['rejected']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,43 @@
 import tkinter as tk
-import random
+import argparse
 import asyncio
+import time
 
+from engine import ARRIVAL_INTERVAL, BOX_SIZE, LINE_WIDTH, LineModel
 
-# 2 cm miara
-LINE_WIDTH = 1440
 LINE_HEIGHT = 100
-BOX_SIZE = 15
-SPEED = 5
-INTERVAL = 250  # jak często jest aktualizowana symulacja
-
-MACHINE_POSITION_REVERSED = [215, 210, 160, 165, 225, 160, 160]
-MACHINE_POSITION = [160, 160, 255, 165, 160, 210, 210]
-
-WAIT_BOX = [ 0,0,0,0,0,0,0,0]
+FPS = 30  # ile razy na sekundę rysujemy, niezależnie od modelu
+SPEEDUPS = [1, 10, 100, 1000]  # ile sekund symulacji na sekundę zegara
 
 class ProductionLineApp:
-    def __init__(self, root):
+    def __init__(self, root, model=None, speedup=1.0):
         self.root = root
         self.root.title("Symulacja")
 
+        # model linii działa bez Tk, okno tylko go pokazuje
+        self.model = model or LineModel()
+        self.model.listeners.append(self.on_model_event)
+
         # pole do rysowania
         self.canvas = tk.Canvas(root, width=LINE_WIDTH, height=LINE_HEIGHT, bg="white")
         self.canvas.pack()
 
-        # lista box i text do manipulacji
-        self.boxes = []
-        self.texts = []
+        # id pudełka -> (box, text) na canvas; wszystkie mają tag "box"
+        self.items = {}
+        # pudełka położone od ostatniej klatki, rysowane dopiero w update_line
+        self.pending = {}
+        self.culled = []
+        # czas modelu, który canvas teraz pokazuje
+        self.drawn_at = self.model.now
+
+        # czas symulacji = sim_origin + (zegar - wall_origin) * speedup
+        self.speedup = speedup
+        self.sim_origin = self.model.now
+        self.wall_origin = time.monotonic()
+        self.frame = 0
+        self.skipped = 0
+        self.status = tk.Label(root, anchor="w")
+        self.status.pack(fill="x")
 #
         self.create_buttons()
 
@@ -39,81 +50,83 @@ class ProductionLineApp:
         button_frame.pack()
 
         for i in range(8):
-            button = tk.Button(button_frame, text=f"dodać pudełko {i+1}", command=lambda i=i: self.add_box(i, 0))
+            button = tk.Button(button_frame, text=f"dodać pudełko {i+1}", command=lambda i=i: self.add_box(i))
             button.grid(row=0, column=i)
         button = tk.Button(button_frame, text=f"random", command=lambda: self.random_box())
         button.grid(row=0, column=8)
-
-    def add_box(self, position, count):
-#
-        y_position = 1 * (LINE_HEIGHT // 8)  
-        x_position = sum(MACHINE_POSITION[:position+1])
-        
-        y = x_position - 1
-        y1= x_position  + BOX_SIZE + 1
-        # Check if there's already a box at this position
-        box_exists = any(self.canvas.coords(b) for b in self.boxes if ( (self.canvas.coords(b)[0]+BOX_SIZE <y1 and self.canvas.coords(b)[0]+BOX_SIZE >y) or(self.canvas.coords(b)[0]<y1 and self.canvas.coords(b)[0]>y))  )
-        numOfBox =   WAIT_BOX[position] 
-
-        if not box_exists:
-            box = self.canvas.create_rectangle(x_position, y_position, x_position + BOX_SIZE, y_position + BOX_SIZE, outline='blue', width=4)
-            text = self.canvas.create_text(x_position + BOX_SIZE / 2, y_position + BOX_SIZE / 2, fill="darkblue", font="Times 20 italic bold", text=position)
-            
-            self.boxes.append(box)
-            self.texts.append(text)
-            print(f"{WAIT_BOX}")
-            if WAIT_BOX[position]<=1:
-                del WAIT_BOX[position]
-                WAIT_BOX.insert(position, 0 )
-            else:
-                del WAIT_BOX[position]
-                WAIT_BOX.insert(position,numOfBox-1)
-        else:
-            print(f"{WAIT_BOX}")
-            next_position = position
-            if count== 0 :
-                self.root.after(INTERVAL, self.add_box, next_position, 1)
-                del WAIT_BOX[position]
-                WAIT_BOX.insert(position,numOfBox+1)
-
-            else:
-                self.root.after(INTERVAL, self.add_box, next_position, 1)
-
-
+        for column, speedup in enumerate(SPEEDUPS, start=9):
+            button = tk.Button(button_frame, text=f"x{speedup}", command=lambda s=speedup: self.set_speedup(s))
+            button.grid(row=0, column=column)
+
+    def sim_time(self):
+        return self.sim_origin + (time.monotonic() - self.wall_origin) * self.speedup
+
+    def set_speedup(self, speedup):
+        # nowy punkt odniesienia, żeby czas symulacji nie skoczył
+        self.sim_origin = self.sim_time()
+        self.wall_origin = time.monotonic()
+        self.frame = 0
+        self.speedup = speedup
+
+    def add_box(self, position):
+        self.model.run(until=self.sim_time())
+        self.model.add_box(position)
+        print(f"{self.model.wait_box}")
+
+    def on_model_event(self, event, data):
+        if event == "place":
+            id, station, belt = data
+            self.pending[id] = (station, belt)
+        elif event == "leave":
+            for id in data.tolist():
+                # pudełko, które weszło i wyszło między klatkami, nigdy nie trafia na canvas
+                if self.pending.pop(id, None) is None:
+                    self.culled.extend(self.items.pop(id))
 
     def update_line(self):
-        # Обновляем положение каждой коробки
-        for box in self.boxes:
-            self.canvas.move(box, -SPEED, 0)
-            x1, y1, x2, y2 = self.canvas.coords(box)
-            
-            # Удаляем коробку, если она вышла за пределы линии
-            if x2 < 0:
-                self.canvas.delete(box)
-                self.boxes.remove(box)
-
-        for text in self.texts:
-            self.canvas.move(text, -SPEED, 0)
-            x1, y1 = self.canvas.coords(text)
-            
-            # Удаляем текст, если он вышел за пределы линии
-            if x1 < 0:
-                self.canvas.delete(text)
-                self.texts.remove(text)
-
-        # Запускаем снова обновление линии через указанный интервал времени
-        self.root.after(INTERVAL, self.update_line)
+        # Модель догоняет время симуляции, затем один кадр: сдвиг, новые и удалённые коробки
+        self.model.run(until=self.sim_time())
+        self.canvas.move("box", -self.model.velocity * (self.model.now - self.drawn_at), 0)
+        self.drawn_at = self.model.now
+        if self.culled:
+            self.canvas.delete(*self.culled)
+            self.culled = []
+        y_position = 1 * (LINE_HEIGHT // 8)
+        for id, (station, belt) in self.pending.items():
+            x_position = belt - self.model.velocity * self.drawn_at
+            rect = self.canvas.create_rectangle(x_position, y_position, x_position + BOX_SIZE, y_position + BOX_SIZE, outline='blue', width=4, tags="box")
+            text = self.canvas.create_text(x_position + BOX_SIZE / 2, y_position + BOX_SIZE / 2, fill="darkblue", font="Times 20 italic bold", text=station, tags="box")
+            self.items[id] = (rect, text)
+        self.pending = {}
+        self.status.configure(text=f"t = {self.model.now:.1f} s  x{self.speedup:g}  pudełek: {self.model.count}  "
+                                   f"WAIT_BOX: {self.model.wait_box}  pominięte klatki: {self.skipped}")
+
+        # Następna klatka w stałym rytmie FPS; jeśli Tk nie nadąża, pomijamy zaległe klatki
+        self.frame += 1
+        now = time.monotonic()
+        behind = int((now - self.wall_origin) * FPS) - self.frame
+        if behind > 0:
+            self.skipped += behind
+            self.frame += behind
+        delay = self.wall_origin + self.frame / FPS - now
+        # Запускаем снова обновление линии к следующему кадру
+        self.root.after(max(1, int(delay * 1000)), self.update_line)
         
         
     def random_box(self):
-           self.add_box(random.randint(0,7), 0)
-           self.root.after(5000, self.random_box)
+        # co ARRIVAL_INTERVAL s czasu symulacji, więc działa też przy przyspieszeniu
+        self.model.run(until=self.sim_time())
+        self.model.start_arrivals(ARRIVAL_INTERVAL)
 
 
 # Основная функция для запуска приложения
 def main():
+    parser = argparse.ArgumentParser(description="Symulacja linii")
+    parser.add_argument("--speedup", type=float, default=1.0, help="sekundy symulacji na sekundę zegara")
+    args = parser.parse_args()
+
     root = tk.Tk()
-    app = ProductionLineApp(root)
+    app = ProductionLineApp(root, speedup=args.speedup)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,125 @@
+import json
+import math
+
+# Parametry ruchu Dobota Magician (jak w DobotArm serwera)
+PTP_VELOCITY = 200.0  # mm/s przy 100%
+PTP_ACCELERATION = 200.0  # mm/s² przy 100%
+CP_VELOCITY = 100.0  # mm/s, ruch ciągły (CP) bez zatrzymań między odcinkami
+CP_ACCELERATION = 100.0  # mm/s²
+COMMAND_LATENCY = 0.02  # s na komendę po łączu szeregowym
+SUCTION_TIME = 0.2  # s na włączenie/wyłączenie ssawki
+
+PICK_POSE = (200.0, -100.0, -40.0, 0.0)
+PLACE_POSE = (200.0, 100.0, -40.0, 0.0)
+LIFT_Z = 40.0
+
+
+def move_time(distance, velocity, acceleration):
+    """Czas ruchu o profilu trapezowym (trójkątnym, gdy odcinek jest krótki)."""
+    if distance <= 0:
+        return 0.0
+    if distance >= velocity * velocity / acceleration:
+        return distance / velocity + velocity / acceleration
+    return 2 * math.sqrt(distance / acceleration)
+
+
+def transfer_path(pick, place, lift_z=LIFT_Z):
+    """Punkty ruchu jednego przeniesienia, tak jak DobotArm._transfer."""
+    (px, py, pz, _), (qx, qy, qz, _) = pick, place
+    return [(px, py, lift_z), (px, py, pz), (px, py, lift_z),
+            (qx, qy, lift_z), (qx, qy, qz), (qx, qy, lift_z)]
+
+
+class MotionModel:
+    """
+    Czas jednego pick & place z parametrów ruchu. W trybie "ptp" ramię staje
+    po każdym odcinku (każdy z rozpędzaniem i hamowaniem), w trybie "cp"
+    przejeżdża całą ścieżkę jednym ruchem ciągłym.
+    """
+
+    def __init__(self, mode="ptp", velocity_ratio=50.0, acceleration_ratio=50.0,
+                 pick=PICK_POSE, place=PLACE_POSE, lift_z=LIFT_Z):
+        self.mode = mode
+        if mode == "cp":
+            self.velocity = CP_VELOCITY * velocity_ratio / 100
+            self.acceleration = CP_ACCELERATION * acceleration_ratio / 100
+        else:
+            self.velocity = PTP_VELOCITY * velocity_ratio / 100
+            self.acceleration = PTP_ACCELERATION * acceleration_ratio / 100
+        self.pick = pick
+        self.place = place
+        self.lift_z = lift_z
+
+    def cycle_time(self):
+        path = transfer_path(self.pick, self.place, self.lift_z)
+        # ramię zaczyna nad miejscem odłożenia poprzedniego pudełka
+        points = [path[-1]] + path
+        lengths = [math.dist(a, b) for a, b in zip(points, points[1:])]
+        if self.mode == "cp":
+            motion = move_time(sum(lengths), self.velocity, self.acceleration) + COMMAND_LATENCY
+        else:
+            motion = sum(move_time(length, self.velocity, self.acceleration) for length in lengths)
+            motion += COMMAND_LATENCY * len(lengths)
+        return motion + 2 * SUCTION_TIME
+
+
+class Station:
+    """
+    Stacja przy taśmie: ``arms`` ramion bierze pudełka z kolejki, każde
+    przenosi pudełko w czasie cyklu, a potem czeka (blokada), aż miejsce
+    na taśmie przed stacją będzie wolne. ``buffer`` to pojemność kolejki
+    (None = bez limitu); pudełka ponad nią są odrzucane.
+
+    Czas cyklu: stały ``cycle_time`` (np. zmierzony przez serwer), losowany
+    z ``samples`` albo z modelu ruchu, z rozrzutem logarytmiczno-normalnym
+    ``jitter``.
+    """
+
+    def __init__(self, position, arms=1, motion=None, cycle_time=None, samples=None, jitter=0.0, buffer=None):
+        self.position = position
+        self.arms = arms
+        self.motion = motion
+        self.cycle_time = cycle_time
+        self.samples = samples
+        self.jitter = jitter
+        self.buffer = buffer
+        self.base_time = motion.cycle_time() if motion is not None else 0.0
+        self.idle = arms
+        self.holding = []  # (pudełko, od kiedy czeka) przeniesione, czekają na miejsce
+        self.retrying = False
+        self.working = 0.0
+        self.blocked = 0.0
+        self.rejected = 0
+
+    def sample(self, rng):
+        if self.cycle_time is not None:
+            base = self.cycle_time
+        elif self.samples:
+            base = rng.choice(self.samples)
+        else:
+            base = self.base_time
+        if self.jitter and base > 0:
+            return base * rng.lognormvariate(-self.jitter ** 2 / 2, self.jitter)
+        return base
+
+
+def load_stations(path, positions):
+    """
+    Stacje z pliku JSON, lista obiektów po kolei dla stacji linii, np.
+      [{"arms": 2, "mode": "ptp", "velocity_ratio": 80, "acceleration_ratio": 60,
+        "pick": [200, -100, -40, 0], "place": [200, 100, -40, 0],
+        "jitter": 0.1, "buffer": 10},
+       {"cycle_time": 4.5}, {"samples": [5.1, 5.4, 6.0]}]
+    Stacje, których w pliku brakuje, dostają domyślne ramię.
+    """
+    with open(path) as file:
+        configs = json.load(file)
+    stations = []
+    for i, position in enumerate(positions):
+        config = configs[i] if i < len(configs) else {}
+        motion = MotionModel(config.get("mode", "ptp"), config.get("velocity_ratio", 50.0),
+                             config.get("acceleration_ratio", 50.0), tuple(config.get("pick", PICK_POSE)),
+                             tuple(config.get("place", PLACE_POSE)), config.get("lift_z", LIFT_Z))
+        stations.append(Station(position, config.get("arms", 1), motion, config.get("cycle_time"),
+                                config.get("samples"), config.get("jitter", 0.0), config.get("buffer")))
+    return stations
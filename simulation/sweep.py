@@ -0,0 +1,127 @@
+import argparse
+import csv
+import itertools
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from engine import ARRIVAL_INTERVAL, MACHINE_POSITION, MACHINE_POSITION_REVERSED, SPEED, STATIONS, LineModel
+
+# Układy maszyn, które można porównywać w przeglądzie
+LAYOUTS = {"default": MACHINE_POSITION, "reversed": MACHINE_POSITION_REVERSED}
+
+# Wielkości uśredniane po powtórzeniach; listy (na stację) idą jako max po stacjach
+METRICS = ["throughput_per_hour", "mean_wait", "max_wait", "mean_queue", "max_queue", "utilisation"]
+PARAMETERS = ["layout", "speed", "arrival_interval", "cycle_time"]
+
+
+def cycle_times(text):
+    """--cycle-time: jedna liczba dla wszystkich stacji albo "2,3.5,0,..." po jednej na stację."""
+    values = tuple(float(value) for value in text.split(","))
+    if len(values) == 1:
+        return values[0]
+    if len(values) != STATIONS:
+        raise argparse.ArgumentTypeError(f"potrzeba 1 albo {STATIONS} wartości, jest {len(values)}")
+    return values
+
+
+def label(value):
+    """Parametr do tabeli i CSV; czasy na stację jako 2/3.5/0/..."""
+    if isinstance(value, tuple):
+        return "/".join(f"{v:g}" for v in value)
+    return value
+
+
+def run_one(job):
+    """Jedna symulacja bez okna; wołana w osobnym procesie."""
+    params, seed, hours, poisson = job
+    model = LineModel(LAYOUTS[params["layout"]], speed=params["speed"],
+                      cycle_time=params["cycle_time"], seed=seed)
+    model.start_arrivals(params["arrival_interval"], poisson)
+    model.run(until=hours * 3600)
+    report = model.report()
+    return params, {name: max(report[name]) if isinstance(report[name], list) else report[name]
+                    for name in METRICS}
+
+
+def jobs(grid, replications, seed, hours, poisson):
+    """Wszystkie kombinacje parametrów razy powtórzenia, każde z własnym ziarnem."""
+    combinations = [dict(zip(PARAMETERS, values)) for values in itertools.product(*(grid[p] for p in PARAMETERS))]
+    seeds = np.random.SeedSequence(seed).generate_state(len(combinations) * replications)
+    for i, (params, _) in enumerate(itertools.product(combinations, range(replications))):
+        yield params, int(seeds[i]), hours, poisson
+
+
+def aggregate(results):
+    """Średnia, odchylenie i 95% przedział ufności średniej dla każdej kombinacji."""
+    groups = {}
+    for params, metrics in results:
+        groups.setdefault(tuple(params[p] for p in PARAMETERS), []).append(metrics)
+    rows = []
+    for key, runs in groups.items():
+        row = dict(zip(PARAMETERS, key), runs=len(runs))
+        for name in METRICS:
+            values = [run[name] for run in runs]
+            mean = statistics.fmean(values)
+            std = statistics.stdev(values) if len(values) > 1 else 0.0
+            row[name] = mean
+            row[f"{name}_std"] = std
+            row[f"{name}_ci95"] = 1.96 * std / len(values) ** 0.5
+        rows.append(row)
+    return rows
+
+
+def print_table(rows):
+    columns = PARAMETERS + ["runs", "throughput_per_hour", "mean_wait", "mean_queue", "max_queue", "utilisation"]
+    print("  ".join(f"{c[:14]:>14}" for c in columns))
+    for row in rows:
+        cells = []
+        for c in columns:
+            value = row[c]
+            if c == "throughput_per_hour":
+                cells.append(f"{value:>8.1f}±{row[c + '_ci95']:<5.1f}")
+            elif isinstance(value, float):
+                cells.append(f"{value:>14.3f}")
+            else:
+                cells.append(f"{label(value)!s:>14}")
+        print("  ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Przegląd parametrów linii i Monte Carlo na wszystkich rdzeniach")
+    parser.add_argument("--layout", nargs="+", choices=sorted(LAYOUTS), default=["default"])
+    parser.add_argument("--speed", type=float, nargs="+", default=[SPEED], help="px na INTERVAL")
+    parser.add_argument("--arrival-interval", type=float, nargs="+", default=[ARRIVAL_INTERVAL])
+    parser.add_argument("--cycle-time", type=cycle_times, nargs="+", default=[0.0],
+                        help="s pracy robota na pudełko; 2,3.5,... to osobny czas dla każdej stacji")
+    parser.add_argument("--replications", type=int, default=10, help="powtórzenia z różnymi ziarnami")
+    parser.add_argument("--hours", type=float, default=8.0, help="czas jednej symulacji")
+    parser.add_argument("--poisson", action="store_true", help="losowe odstępy między pudełkami")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--csv", help="zapisz tabelę do pliku CSV")
+    args = parser.parse_args()
+
+    grid = {"layout": args.layout, "speed": args.speed,
+            "arrival_interval": args.arrival_interval, "cycle_time": args.cycle_time}
+    work = list(jobs(grid, args.replications, args.seed, args.hours, args.poisson))
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(run_one, work, chunksize=max(1, len(work) // (args.workers * 4))))
+    elapsed = time.perf_counter() - started
+
+    rows = aggregate(results)
+    print_table(rows)
+    print(f"{len(work)} symulacji po {args.hours:g} h w {elapsed:.1f} s na {args.workers} procesach")
+    if args.csv:
+        with open(args.csv, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows({key: label(value) for key, value in row.items()} for row in rows)
+
+
+if __name__ == "__main__":
+    main()
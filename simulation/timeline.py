@@ -0,0 +1,141 @@
+import json
+
+import numpy as np
+
+# Rodzaje zdarzeń stacji w kolumnie event_kind
+ARRIVE, START, PICKED, PLACE, REJECT = range(5)
+KINDS = ["arrive", "start", "picked", "place", "reject"]
+CHUNK = 8192  # wierszy zbieranych w liście, zanim trafią do tablic
+
+
+class Columns:
+    """Tabela kolumnowa w prealokowanych tablicach NumPy, powiększana x2."""
+
+    def __init__(self, dtypes, capacity=65536):
+        self.count = 0
+        self.data = {name: np.empty(capacity, dtype=dtype) for name, dtype in dtypes.items()}
+
+    def reserve(self, extra):
+        needed = self.count + extra
+        capacity = len(next(iter(self.data.values())))
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self.data.items():
+            bigger = np.empty(capacity, dtype=column.dtype)
+            bigger[:self.count] = column[:self.count]
+            self.data[name] = bigger
+
+    def extend(self, **columns):
+        n = len(next(iter(columns.values())))
+        self.reserve(n)
+        for name, values in columns.items():
+            self.data[name][self.count:self.count + n] = values
+        self.count += n
+
+    def arrays(self):
+        return {name: column[:self.count] for name, column in self.data.items()}
+
+
+class Recorder:
+    """
+    Zapisuje przebieg symulacji: wiersz na każde pudełko położone na taśmie
+    (przybycie, start ramienia, przeniesienie, położenie i ``left``, czyli
+    kiedy zjedzie z taśmy, znane już przy położeniu) oraz odrzucenia.
+    ``save`` zapisuje kolumny do skompresowanego .npz.
+
+    Wiersze idą najpierw do zwykłych list krotek i są przepisywane do
+    tablic po CHUNK naraz; przypisanie pojedynczych wartości do tablic
+    NumPy kosztowałoby więcej niż samo pudełko w symulacji. Zdarzenia stacji
+    (z długością kolejki) są odtwarzane z tych kolumn dopiero w ``events``.
+    """
+
+    def __init__(self, capacity=65536):
+        self.boxes = Columns({"id": np.int64, "station": np.int16, "arrived": np.float64, "started": np.float64,
+                              "picked": np.float64, "placed": np.float64, "left": np.float64}, capacity)
+        self.rejects = Columns({"time": np.float64, "station": np.int16}, 1024)
+        self.pending = []
+        self.pending_rejects = []
+
+    def box(self, id, station, arrived, started, picked, placed, left):
+        self.pending.append((id, station, arrived, started, picked, placed, left))
+        if len(self.pending) >= CHUNK:
+            self.flush()
+
+    def reject(self, time, station):
+        self.pending_rejects.append((time, station))
+        if len(self.pending_rejects) >= CHUNK:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.boxes.extend(**dict(zip(self.boxes.data, zip(*self.pending))))
+            self.pending = []
+        if self.pending_rejects:
+            self.rejects.extend(**dict(zip(self.rejects.data, zip(*self.pending_rejects))))
+            self.pending_rejects = []
+
+    def events(self):
+        """
+        Zdarzenia stacji po czasie: time, station, kind, box (-1 dla
+        odrzuceń) i queue, czyli ile pudełek stacji jest po zdarzeniu poza
+        taśmą (w kolejce albo w zablokowanym ramieniu). Pudełka, które do
+        końca przebiegu nie trafiły na taśmę, nie są liczone.
+        """
+        self.flush()
+        boxes, rejects = self.boxes.arrays(), self.rejects.arrays()
+        n, m = self.boxes.count, self.rejects.count
+        time = np.concatenate([boxes["arrived"], boxes["started"], boxes["picked"], boxes["placed"], rejects["time"]])
+        station = np.concatenate([np.tile(boxes["station"], 4), rejects["station"]])
+        kind = np.concatenate([np.repeat(np.arange(REJECT, dtype=np.int8), n), np.full(m, REJECT, np.int8)])
+        box = np.concatenate([np.tile(boxes["id"], 4), np.full(m, -1, np.int64)])
+        # przybycie i przeniesienie dodają pudełko, start i położenie je zabierają;
+        # w tej samej chwili zdarzenia idą w kolejności rodzajów
+        delta = np.array([1, -1, 1, -1, 0], np.int32)[kind]
+        by_station = np.lexsort((kind, time, station))
+        total = np.cumsum(delta[by_station])
+        first = np.flatnonzero(np.r_[True, np.diff(station[by_station]) != 0])
+        counts = np.diff(np.r_[first, len(by_station)])
+        queue = np.empty(len(time), np.int32)
+        queue[by_station] = total - np.repeat(total[first] - delta[by_station][first], counts)
+        order = np.lexsort((kind, time))
+        return {"time": time[order], "station": station[order], "kind": kind[order],
+                "box": box[order], "queue": queue[order]}
+
+    def summary(self):
+        self.flush()
+        boxes = self.boxes.arrays()
+        stations = {}
+        wait = boxes["placed"] - boxes["arrived"]
+        queued = boxes["started"] - boxes["arrived"]
+        blocked = boxes["placed"] - boxes["picked"]
+        on_belt = boxes["left"] - boxes["placed"]
+        rejected = np.bincount(self.rejects.arrays()["station"])
+        for station in np.unique(boxes["station"]).tolist():
+            mask = boxes["station"] == station
+            stations[station] = {
+                "boxes": int(mask.sum()),
+                "rejected": int(rejected[station]) if station < len(rejected) else 0,
+                "wait_mean": float(wait[mask].mean()),
+                "wait_p50": float(np.percentile(wait[mask], 50)),
+                "wait_p95": float(np.percentile(wait[mask], 95)),
+                "queued_mean": float(queued[mask].mean()),
+                "blocked_mean": float(blocked[mask].mean()),
+                "on_belt_mean": float(on_belt[mask].mean()),
+            }
+        return {
+            "boxes": self.boxes.count,
+            "rejected": self.rejects.count,
+            "wait_mean": float(wait.mean()) if len(wait) else 0.0,
+            "wait_p95": float(np.percentile(wait, 95)) if len(wait) else 0.0,
+            "stations": stations,
+        }
+
+    def save(self, path, **extra):
+        summary = self.summary()
+        columns = {f"box_{name}": values for name, values in self.boxes.arrays().items()}
+        columns.update({f"event_{name}": values for name, values in self.events().items()})
+        np.savez_compressed(path, **columns, event_kinds=np.array(KINDS),
+                            summary=np.array(json.dumps({**summary, **extra})))
+        return summary